@@ -1,12 +1,39 @@
-def analyse_temperature_trend(temperatures: list[float]) -> str:
+from collections import namedtuple
+from collections.abc import Iterable
+from itertools import accumulate, pairwise
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Trends by code: 1 if a range of readings is increasing, plus 2 if it is decreasing
+TREND_LABELS = ("inconsistent", "increasing", "decreasing", "inconsistent")
+
+TrendReport = namedtuple(
+    "TrendReport", "trend first_violation longest_increasing_run longest_decreasing_run"
+)
+
+
+def analyse_temperature_trend(temperatures: Iterable[float]) -> str:
     """
-    Analyzes the temperature trend.
-    
-    :param temperatures: List of temperature values
+    Analyzes the temperature trend in a single pass.
+
+    Stops reading as soon as the readings are neither increasing nor decreasing,
+    so temperatures can be a generator over a stream that does not fit in memory.
+
+    :param temperatures: Iterable of temperature values
     :return: "increasing", "decreasing" or "inconsistent"
     """
-    increasing = all(temperatures[i] < temperatures[i + 1] for i in range(len(temperatures) - 1))
-    decreasing = all(temperatures[i] > temperatures[i + 1] for i in range(len(temperatures) - 1))
+    readings = iter(temperatures)
+    previous = next(readings, None)
+    increasing = decreasing = True
+    for current in readings:
+        increasing = increasing and previous < current
+        decreasing = decreasing and previous > current
+        if not (increasing or decreasing):
+            return "inconsistent"
+        previous = current
 
     match (increasing, decreasing):
         case (True, False):
@@ -15,3 +42,144 @@ def analyse_temperature_trend(temperatures: list[float]) -> str:
             return "decreasing"
         case _:
             return "inconsistent"
+
+
+def temperature_trend_report(temperatures: Iterable[float]) -> TrendReport:
+    """
+    Analyzes the temperature trend in a single pass over all readings.
+
+    :param temperatures: Iterable of temperature values
+    :return: The trend as returned by analyse_temperature_trend, the index of the
+        first reading which makes the readings neither increasing nor decreasing
+        (None if there is none) and the number of readings in the longest
+        strictly increasing and strictly decreasing runs
+    """
+    readings = iter(temperatures)
+    previous = next(readings, None)
+    if previous is None:
+        return TrendReport("inconsistent", None, 0, 0)
+    first_violation = None
+    increasing = decreasing = True
+    increasing_run = decreasing_run = longest_increasing = longest_decreasing = 1
+    for index, current in enumerate(readings, start=1):
+        increasing_run = increasing_run + 1 if previous < current else 1
+        decreasing_run = decreasing_run + 1 if previous > current else 1
+        longest_increasing = max(longest_increasing, increasing_run)
+        longest_decreasing = max(longest_decreasing, decreasing_run)
+        increasing = increasing and increasing_run > 1
+        decreasing = decreasing and decreasing_run > 1
+        if first_violation is None and not (increasing or decreasing):
+            first_violation = index
+        previous = current
+
+    match (increasing, decreasing):
+        case (True, False):
+            trend = "increasing"
+        case(False, True):
+            trend = "decreasing"
+        case _:
+            trend = "inconsistent"
+    return TrendReport(trend, first_violation, longest_increasing, longest_decreasing)
+
+
+def _break_counts(values):
+    """
+    Counts the steps which are not increasing and not decreasing up to every reading
+    along the last axis, so any range of readings is checked with a few lookups.
+    """
+    # Neighbours are compared rather than subtracted, which would wrap around for unsigned readings
+    previous, current = values[..., :-1], values[..., 1:]
+    padding = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    not_increasing = np.pad(np.cumsum(~(previous < current), axis=-1), padding)
+    not_decreasing = np.pad(np.cumsum(~(previous > current), axis=-1), padding)
+    return not_increasing, not_decreasing
+
+
+def _break_counts_list(values):
+    steps = list(pairwise(values))
+    not_increasing = list(accumulate((not previous < current for previous, current in steps), initial=0))
+    not_decreasing = list(accumulate((not previous > current for previous, current in steps), initial=0))
+    return not_increasing, not_decreasing
+
+
+def _trend_labels(not_increasing, not_decreasing, firsts, lasts):
+    """
+    Labels the readings from firsts to lasts (inclusive) given their break counts.
+    """
+    codes = (not_increasing[..., lasts] == not_increasing[..., firsts]) + 2 * (
+        not_decreasing[..., lasts] == not_decreasing[..., firsts]
+    )
+    return np.asarray(TREND_LABELS)[codes]
+
+
+def _series(values, offsets):
+    return [values[start:end] for start, end in pairwise(offsets)]
+
+
+def analyse_temperature_trends(series, offsets=None):
+    """
+    Analyzes the temperature trends of many series at once.
+
+    :param series: 2D array with one series per row, or the readings of all series
+        one after another if offsets is given
+    :param offsets: Index of the first reading of each series, followed by the
+        total number of readings
+    :return: Array of "increasing", "decreasing" or "inconsistent" per series
+        (a list if NumPy is not installed)
+    """
+    if np is None:
+        rows = series if offsets is None else _series(series, offsets)
+        return [analyse_temperature_trend(row) for row in rows]
+    values = np.asarray(series)
+    not_increasing, not_decreasing = _break_counts(values)
+    if offsets is None:
+        if not values.shape[-1]:
+            return np.full(len(values), TREND_LABELS[0])
+        return _trend_labels(not_increasing, not_decreasing, 0, -1)
+    offsets = np.asarray(offsets)
+    # Empty series are checked like series of one reading
+    last = max(len(values) - 1, 0)
+    firsts = np.minimum(offsets[:-1], last)
+    lasts = np.clip(offsets[1:] - 1, firsts, None)
+    return _trend_labels(not_increasing, not_decreasing, firsts, lasts)
+
+
+def analyse_temperature_trend_windows(series, window, offsets=None):
+    """
+    Analyzes the temperature trend of every window of consecutive readings of many
+    series, in time proportional to the number of readings whatever the window length.
+
+    :param series: 2D array with one series per row, or the readings of all series
+        one after another if offsets is given
+    :param window: Number of readings per window
+    :param offsets: Index of the first reading of each series, followed by the
+        total number of readings
+    :return: Trend of the window starting at each reading for which the series
+        has enough readings, as a 2D array for a 2D array and as a list with an
+        array per series if offsets is given (lists if NumPy is not installed)
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    if np is None:
+        labels = []
+        for row in (series if offsets is None else _series(series, offsets)):
+            not_increasing, not_decreasing = _break_counts_list(row)
+            labels.append([
+                TREND_LABELS[
+                    (not_increasing[first + window - 1] == not_increasing[first])
+                    + 2 * (not_decreasing[first + window - 1] == not_decreasing[first])
+                ]
+                for first in range(len(row) - window + 1)
+            ])
+        return labels
+    values = np.asarray(series)
+    not_increasing, not_decreasing = _break_counts(values)
+    if offsets is None:
+        firsts = np.arange(max(values.shape[-1] - window + 1, 0))
+        return _trend_labels(not_increasing, not_decreasing, firsts, firsts + window - 1)
+    offsets = np.asarray(offsets)
+    counts = np.maximum(np.diff(offsets) - window + 1, 0)
+    # Windows of all series one after another, each series starting at its first reading
+    firsts = np.arange(counts.sum()) + np.repeat(offsets[:-1] - np.cumsum(counts) + counts, counts)
+    labels = _trend_labels(not_increasing, not_decreasing, firsts, firsts + window - 1)
+    return np.split(labels, np.cumsum(counts)[:-1])
@@ -1,39 +1,460 @@
 import json
+import mmap
 import os
 import random
+import re
+import sys
+from bisect import bisect_right
+from heapq import nlargest
+from collections import defaultdict, namedtuple
+from collections.abc import Sequence
+
+# Journal entries kept before they are compacted into the JSON file
+MIN_JOURNAL_LENGTH = 1000
+# Length of the n-grams used to index titles and authors
+NGRAM_LENGTH = 3
+WORD_PATTERN = re.compile(r"\w+")
+# Bytes of the JSON file covered by one entry of a lazy bookshelf's offset index
+LAZY_BLOCK_SIZE = 1 << 16
+# Blocks whose book offsets a lazy bookshelf keeps in memory
+LAZY_CACHED_BLOCKS = 16
+# Bytes of the JSON file scanned at once when a lazy bookshelf groups its books for recommendations
+LAZY_SCAN_SIZE = 1 << 24
+# Draws per book asked for before draw_unique stops skipping repeated books
+MAX_DRAWS_PER_BOOK = 4
+# Books shown at once by the menu
+PAGE_SIZE = 20
+BOOK_LINE_START = re.compile(rb"\n\{")
+# Genre and rating at the end of a book line written by save_bookshelf
+BOOK_LINE_END = re.compile(rb'("genre": "[^"\\\n]*(?:\\.[^"\\\n]*)*", "rating": \d+)\},?$', re.MULTILINE)
+
+# A compact book record, stored in JSON as an object with the same keys
+Book = namedtuple("Book", "title author genre rating")
+
+
+def book_from_json(data):
+    """Creates a Book from its JSON object, sharing equal author and genre strings between books.
+
+    Args:
+        data (dict): The book as loaded from JSON.
+
+    Returns:
+        Book: The book record.
+    """
+    return Book(data["title"], sys.intern(data["author"]), sys.intern(data["genre"]), data["rating"])
+
+
+def ngrams(text):
+    """Returns the n-grams of a text, or the text itself if it is shorter than NGRAM_LENGTH.
+
+    Args:
+        text (str): The text, lowercased.
+
+    Returns:
+        set: The distinct n-grams.
+    """
+    if len(text) < NGRAM_LENGTH:
+        return {text} if text else set()
+    return {text[start:start + NGRAM_LENGTH] for start in range(len(text) - NGRAM_LENGTH + 1)}
+
+
+class LazyBooks(Sequence):
+    """The books of a bookshelf JSON file with one book per line, parsed only when accessed.
+
+    The file is memory-mapped and only the number of books starting in each block of
+    LAZY_BLOCK_SIZE bytes is counted up front. The offsets of the books in a block are
+    looked up when one of them is first accessed.
+
+    Attributes:
+        file_books (int): The number of books in the file.
+        added (list): Books appended after loading the file.
+    """
+
+    def __init__(self, file):
+        """Maps the given bookshelf file and counts its books per block.
+
+        Args:
+            file (file): The bookshelf JSON file, opened in binary mode.
+        """
+        self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Every line but the first and the closing bracket holds a book, so counting
+        # the line breaks before the lines starting in a block counts its books
+        block_counts = [
+            self.map[max(start - 1, 0):min(start + LAZY_BLOCK_SIZE, len(self.map)) - 1].count(b"\n")
+            for start in range(0, len(self.map), LAZY_BLOCK_SIZE)
+        ]
+        block_counts[(self.map.rfind(b"\n]") + 1) // LAZY_BLOCK_SIZE] -= 1
+        self.block_first_books = []
+        self.file_books = 0
+        for count in block_counts:
+            self.block_first_books.append(self.file_books)
+            self.file_books += count
+        self.block_offsets = {}
+        self.added = []
+
+    @staticmethod
+    def is_line_format(file):
+        """Checks if a bookshelf file holds one book per line, as written by save_bookshelf.
+
+        Args:
+            file (file): The bookshelf JSON file, opened in binary mode.
+        """
+        lines = file.read(LAZY_BLOCK_SIZE).split(b"\n", 2)
+        file.seek(0)
+        return len(lines) > 1 and lines[0] == b"[" and lines[1][:1] == b"{"
+
+    def book_offsets(self, block):
+        """Returns the offsets of the lines of the books starting in the given block."""
+        offsets = self.block_offsets.get(block)
+        if offsets is None:
+            if len(self.block_offsets) >= LAZY_CACHED_BLOCKS:
+                self.block_offsets.clear()
+            start = block * LAZY_BLOCK_SIZE
+            offsets = self.block_offsets[block] = [
+                match.start() + 1
+                for match in BOOK_LINE_START.finditer(self.map, max(start - 1, 0), start + LAZY_BLOCK_SIZE)
+            ]
+        return offsets
+
+    def __len__(self):
+        return self.file_books + len(self.added)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("book index out of range")
+        if index >= self.file_books:
+            return self.added[index - self.file_books]
+        block = bisect_right(self.block_first_books, index) - 1
+        start = self.book_offsets(block)[index - self.block_first_books[block]]
+        line = self.map[start:self.map.find(b"\n", start)]
+        return book_from_json(json.loads(line.rstrip(b",")))
+
+    def append(self, book):
+        self.added.append(book)
+
+    def close(self):
+        """Unmaps the file, after which only books appended since loading can be accessed."""
+        self.map.close()
+
+    def book_groups(self):
+        """Groups the books of the file by rating and genre with one scan, without parsing the books.
+
+        Returns:
+            dict | None: Book indexes by (rating, genre), or None if not every book line ends
+                like the ones written by save_bookshelf.
+        """
+        lines = {}
+        index = start = 0
+        while start < len(self.map):
+            end = self.map.find(b"\n", start + LAZY_SCAN_SIZE) + 1 or len(self.map)
+            for line_end in BOOK_LINE_END.findall(self.map, start, end):
+                indexes = lines.get(line_end)
+                if indexes is None:
+                    indexes = lines[line_end] = []
+                indexes.append(index)
+                index += 1
+            start = end
+        if index != self.file_books:
+            return None
+        groups = {}
+        for line_end, indexes in lines.items():
+            data = json.loads(b"{" + line_end + b"}")
+            groups.setdefault((data["rating"], sys.intern(data["genre"])), []).extend(indexes)
+        return groups
+
+
+class RecommendationSampler:
+    """Draws book indexes with a probability proportional to the book's rating times its genre's weight.
+
+    Books are grouped by rating and genre, so adding a book only appends its index to its group.
+    A Vose alias table over the groups picks a group in O(1) and a uniform index within the group
+    picks the book. The table only covers the few groups and is rebuilt on the next draw after
+    books were added.
+
+    Attributes:
+        genre_weights (dict): Weights of genres, genres not listed weigh 1.
+        groups (dict): Book indexes by (rating, genre).
+    """
+
+    def __init__(self, genre_weights=None):
+        """Initializes an empty sampler.
+
+        Args:
+            genre_weights (dict): Weights of genres, genres not listed weigh 1. Defaults to None.
+        """
+        self.genre_weights = genre_weights or {}
+        self.groups = {}
+        self.group_keys = []
+        self.probabilities = []
+        self.aliases = []
+        self.outdated = False
+
+    def weight(self, rating, genre):
+        return rating * self.genre_weights.get(genre, 1)
+
+    def add(self, index, book):
+        """Adds a book to the sampler.
+
+        Args:
+            index (int): The position of the book in the bookshelf.
+            book (Book): The book to add.
+        """
+        self.add_group(book.rating, book.genre, [index])
+
+    def add_group(self, rating, genre, indexes):
+        """Adds books with the same rating and genre to the sampler.
+
+        Args:
+            rating (int): The rating of the books.
+            genre (str): The genre of the books.
+            indexes (list): The positions of the books in the bookshelf.
+        """
+        if self.weight(rating, genre) > 0:
+            self.groups.setdefault((rating, genre), []).extend(indexes)
+            self.outdated = True
+
+    def build(self):
+        """Builds the alias table over the groups with Vose's method."""
+        self.group_keys = list(self.groups)
+        weights = [self.weight(*key) * len(self.groups[key]) for key in self.group_keys]
+        total = sum(weights)
+        count = len(weights)
+        self.probabilities = [weight * count / total for weight in weights]
+        self.aliases = list(range(count))
+        small = [i for i, probability in enumerate(self.probabilities) if probability < 1]
+        large = [i for i, probability in enumerate(self.probabilities) if probability >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.aliases[less] = more
+            self.probabilities[more] -= 1 - self.probabilities[less]
+            (small if self.probabilities[more] < 1 else large).append(more)
+        for i in small + large:
+            self.probabilities[i] = 1  # Left over only by rounding errors
+        self.outdated = False
+
+    def __len__(self):
+        return sum(len(indexes) for indexes in self.groups.values())
+
+    def draw(self):
+        """Draws the index of one book.
+
+        Returns:
+            int: The position of the drawn book in the bookshelf.
+        """
+        if self.outdated:
+            self.build()
+        slot = random.randrange(len(self.group_keys))
+        if random.random() >= self.probabilities[slot]:
+            slot = self.aliases[slot]
+        return random.choice(self.groups[self.group_keys[slot]])
+
+    def draw_unique(self, count):
+        """Draws the indexes of up to count different books.
+
+        Successive draws skip books drawn before. When more than half of the books are asked for,
+        or when skipping takes too many draws because a few books carry most of the weight, the
+        (remaining) books are ranked by random keys weighted like the draws instead
+        (Efraimidis-Spirakis), which continues the same sampling without replacement.
+
+        Args:
+            count (int): The number of books to draw.
+
+        Returns:
+            list: The positions of the drawn books in the bookshelf.
+        """
+        size = len(self)
+        count = min(count, size)
+        drawn = {}
+        if count <= size // 2:
+            for _ in range(MAX_DRAWS_PER_BOOK * count):
+                drawn.setdefault(self.draw())
+                if len(drawn) == count:
+                    return list(drawn)
+        keys = (
+            (random.random() ** (1 / self.weight(*key)), index)
+            for key, indexes in self.groups.items()
+            for index in indexes
+            if index not in drawn
+        )
+        return list(drawn) + [index for _, index in nlargest(count - len(drawn), keys)]
+
 
 class Bookshelf:
     """A class to manage a bookshelf with books.
 
+    New books are appended to a JSON Lines journal next to the JSON file, which
+    is compacted into the JSON file once it holds half as many books as the
+    file, so adding a book costs O(1) I/O on average. Lazy bookshelves read
+    their books from a memory-mapped JSON file when needed (see LazyBooks).
+    Titles and authors are indexed by lowercased words and n-grams on the
+    first search, so searches only check books which contain every n-gram
+    of the keyword. Recommendations are drawn by a RecommendationSampler
+    built on the first recommendation.
+
     Attributes:
         file_name (str): The name of the JSON file to store the bookshelf data.
-        books (list): A list of dictionaries representing books in the bookshelf.
+        journal_name (str): The name of the JSON Lines journal of added books.
+        books (list | LazyBooks): A sequence of Book records representing books in the bookshelf.
+        lazy (bool): Whether the books are read from the JSON file when needed.
+        genre_weights (dict): Weights of genres for recommendations, genres not listed weigh 1.
     """
 
-    def __init__(self, file_name="bookshelf.json"):
+    def __init__(self, file_name="bookshelf.json", lazy=False, genre_weights=None):
         """Initializes the Bookshelf with a given file name.
 
         Args:
             file_name (str): The name of the JSON file to store the bookshelf data. Defaults to "bookshelf.json".
+            lazy (bool): Read books from the memory-mapped file when needed instead of loading them all.
+                Falls back to loading them all if the file was not written by save_bookshelf. Defaults to False.
+            genre_weights (dict): Weights of genres for recommendations, genres not listed weigh 1. Defaults to None.
         """
         self.file_name = file_name
+        self.journal_name = file_name + ".journal"
+        self.journal_length = 0
+        self.lazy = lazy
         self.books = self.load_bookshelf()
+        self.ngram_index = None
+        self.word_index = None
+        self.short_ngrams = None
+        self.lowered_texts = None
+        self.genre_weights = genre_weights
+        self.sampler = None
 
     def load_bookshelf(self):
-        """Loads the bookshelf from a JSON file or creates a new one if the file does not exist.
+        """Loads the bookshelf from a JSON file and its journal or creates a new one if the file does not exist.
 
         Returns:
-            list: A list of dictionaries representing books in the bookshelf.
+            list | LazyBooks: A sequence of Book records representing books in the bookshelf.
         """
+        books = []
         if os.path.exists(self.file_name):
-            with open(self.file_name, "r") as file:
-                return json.load(file)
-        return []
+            with open(self.file_name, "rb") as file:
+                if self.lazy and LazyBooks.is_line_format(file):
+                    books = LazyBooks(file)
+                else:
+                    books = [book_from_json(data) for data in json.load(file)]
+        self.journal_length = 0
+        if os.path.exists(self.journal_name):
+            for data in self.read_journal(len(books)):
+                books.append(book_from_json(data))
+                self.journal_length += 1
+        return books
+
+    def read_journal(self, file_books):
+        """Reads the books of the journal, repairing it after an interrupted write or compaction.
+
+        An entry cut off by an interrupted write is truncated, so later entries start on a new line.
+        If the journal ends with the marker written before its books were compacted into the JSON
+        file, and the file holds as many books as the marker says, the compaction completed and
+        the journal is removed.
+
+        Args:
+            file_books (int): The number of books in the JSON file.
+
+        Returns:
+            list: The JSON objects of the books in the journal.
+        """
+        entries = []
+        complete = 0  # Bytes of complete entries
+        with open(self.journal_name, "rb") as journal:
+            for line in journal:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+                complete += len(line)
+        if complete < os.path.getsize(self.journal_name):
+            with open(self.journal_name, "r+b") as journal:
+                journal.truncate(complete)
+        if entries and entries[-1].get("compacted") == file_books:
+            os.remove(self.journal_name)
+            return []
+        return [data for data in entries if "compacted" not in data]
 
     def save_bookshelf(self):
-        """Saves the current state of the bookshelf to a JSON file."""
-        with open(self.file_name, "w") as file:
-            json.dump(self.books, file, indent=4)
+        """Saves the current state of the bookshelf to a JSON file and empties the journal.
+
+        The file holds one book per line, so it stays valid JSON while being cheap to scan line by line.
+        Before the file is replaced, the journal is marked with the number of books in the new file,
+        so a crash before the journal is removed does not add its books twice (see read_journal).
+        """
+        temporary_name = self.file_name + ".tmp"
+        with open(temporary_name, "w") as file:
+            file.write("[\n")
+            file.write(",\n".join(json.dumps(book._asdict()) for book in self.books))
+            file.write("\n]\n")
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(self.journal_name):
+            with open(self.journal_name, "a") as journal:
+                journal.write(json.dumps({"compacted": len(self.books)}) + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+        if isinstance(self.books, LazyBooks):
+            self.books.close()  # A mapped file cannot be replaced on Windows
+        try:
+            os.replace(temporary_name, self.file_name)
+        except OSError:
+            if self.lazy:
+                self.books = self.load_bookshelf()  # Map the old file and its journal again
+            raise
+        if os.path.exists(self.journal_name):
+            os.remove(self.journal_name)
+        self.journal_length = 0
+        if self.lazy:
+            self.books = self.load_bookshelf()  # Map the new file instead of keeping added books in memory
+
+    def append_to_journal(self, book):
+        """Appends a book to the journal, compacting the journal into the JSON file when it grows too long.
+
+        Args:
+            book (Book): The book which was added to the bookshelf.
+        """
+        with open(self.journal_name, "a") as journal:
+            journal.write(json.dumps(book._asdict()) + "\n")
+        self.journal_length += 1
+        if self.journal_length >= max(MIN_JOURNAL_LENGTH, len(self.books) // 2):
+            self.save_bookshelf()
+
+    def build_index(self):
+        """Indexes the titles and authors of all books for searching."""
+        self.ngram_index = defaultdict(set)
+        self.word_index = defaultdict(set)
+        self.short_ngrams = defaultdict(set)
+        self.lowered_texts = []
+        for index, book in enumerate(self.books):
+            self.index_book(index, book)
+
+    def index_book(self, index, book):
+        """Adds a book's lowercased title and author words and n-grams to the search indexes.
+
+        Each new n-gram is also listed under its substrings shorter than NGRAM_LENGTH, so shorter
+        keywords are looked up through the n-grams containing them. The lowercased title and author
+        are kept to check the candidates of a search.
+
+        Args:
+            index (int): The position of the book in the bookshelf, the next one not indexed yet.
+            book (Book): The book to index.
+        """
+        texts = (book.title.lower(), sys.intern(book.author.lower()))
+        self.lowered_texts.append(texts)
+        for text in texts:
+            for ngram in ngrams(text):
+                postings = self.ngram_index.get(ngram)
+                if postings is None:
+                    postings = self.ngram_index[ngram] = set()
+                    for length in range(1, min(len(ngram), NGRAM_LENGTH - 1) + 1):
+                        for start in range(len(ngram) - length + 1):
+                            self.short_ngrams[ngram[start:start + length]].add(ngram)
+                postings.add(index)
+            for word in WORD_PATTERN.findall(text):
+                self.word_index[word].add(index)
 
     def add_book(self, title, author, genre):
         """Adds a new book to the bookshelf.
@@ -43,30 +464,77 @@ class Bookshelf:
             author (str): The author of the book.
             genre (str): The genre of the book.
         """
-        book = {
-            "title": title,
-            "author": author,
-            "genre": genre,
-            "rating": random.randint(1, 5)  # Assign a random rating between 1 and 5 stars
-        }
+        book = Book(
+            title=title,
+            author=sys.intern(author),
+            genre=sys.intern(genre),
+            rating=random.randint(1, 5)  # Assign a random rating between 1 and 5 stars
+        )
         self.books.append(book)
-        self.save_bookshelf()
+        if self.ngram_index is not None:
+            self.index_book(len(self.books) - 1, book)
+        if self.sampler is not None:
+            self.sampler.add(len(self.books) - 1, book)
+        self.append_to_journal(book)
         print(f"Book '{title}' added successfully!")
 
-    def show_bookshelf(self):
-        """Displays all books on the bookshelf in a formatted way."""
+    def show_bookshelf(self, first=1, count=None):
+        """Displays books on the bookshelf in a formatted way.
+
+        Args:
+            first (int): The number of the first book to show. Defaults to 1.
+            count (int): The number of books to show. Defaults to all remaining books.
+        """
         if not self.books:
             print("\nYour bookshelf is empty.")
             return
 
-        print("\nYour Bookshelf:")
-        for i, book in enumerate(self.books, start=1):
+        if first == 1:
+            print("\nYour Bookshelf:")
+        last = len(self.books) if count is None else min(first - 1 + count, len(self.books))
+        for i in range(first, last + 1):
+            book = self.books[i - 1]
             print(f"""
 Book {i}:
-  Title : {book['title']}
-  Author: {book['author']}
-  Genre : {book['genre']}
-  Rating: {'⭐' * book['rating']} ({book['rating']}/5)""")
+  Title : {book.title}
+  Author: {book.author}
+  Genre : {book.genre}
+  Rating: {'⭐' * book.rating} ({book.rating}/5)""")
+
+    def find_books(self, keyword):
+        """Finds the books whose title or author contains the keyword, ignoring case.
+
+        Books where the keyword is a whole word come first, then books matching in the title,
+        otherwise the bookshelf order is kept.
+
+        Args:
+            keyword (str): The keyword to search for in the title or author of the books.
+
+        Returns:
+            list: The matching books, best matches first.
+        """
+        if self.ngram_index is None:
+            self.build_index()
+        keyword = keyword.lower()
+        if not keyword:
+            candidates = range(len(self.books))
+        elif len(keyword) < NGRAM_LENGTH:
+            candidates = set().union(*(self.ngram_index[ngram] for ngram in self.short_ngrams.get(keyword, ())))
+        else:
+            postings = sorted(
+                (self.ngram_index.get(keyword[start:start + NGRAM_LENGTH], set())
+                 for start in range(len(keyword) - NGRAM_LENGTH + 1)),
+                key=len,
+            )
+            candidates = set.intersection(*postings)
+        word_matches = self.word_index.get(keyword, set())
+        ranked = []
+        for index in candidates:
+            title, author = self.lowered_texts[index]
+            in_title = keyword in title
+            if in_title or keyword in author:
+                ranked.append((index not in word_matches, not in_title, index))
+        return [self.books[index] for *_, index in sorted(ranked)]
 
     def search_books(self, keyword):
         """Searches for books by title or author.
@@ -74,33 +542,60 @@ Book {i}:
         Args:
             keyword (str): The keyword to search for in the title or author of the books.
         """
-        matches = [
-            book for book in self.books
-            if keyword.lower() in book['title'].lower() or keyword.lower() in book['author'].lower()
-        ]
+        matches = self.find_books(keyword)
         if matches:
             print("\nSearch Results:")
             for book in matches:
-                print(f"  - {book['title']} by {book['author']} (Genre: {book['genre']})")
+                print(f"  - {book.title} by {book.author} (Genre: {book.genre})")
         else:
             print("No matches found!")
 
-    def recommend_book(self):
-        """Recommends a random book from the bookshelf."""
-        if not self.books:
+    def recommend_books(self, count=1):
+        """Draws different books, favouring better rated books and books of heavier genres.
+
+        The sampler is built from the ratings and genres of all books on the first call. For a lazy
+        bookshelf they are read with one scan of the file (see LazyBooks.book_groups) instead of
+        parsing every book.
+
+        Args:
+            count (int): The number of books to draw. Defaults to 1.
+
+        Returns:
+            list: Up to count different books.
+        """
+        if self.sampler is None:
+            self.sampler = RecommendationSampler(self.genre_weights)
+            books = enumerate(self.books)
+            groups = self.books.book_groups() if isinstance(self.books, LazyBooks) else None
+            if groups is not None:
+                for (rating, genre), indexes in groups.items():
+                    self.sampler.add_group(rating, genre, indexes)
+                books = enumerate(self.books.added, start=self.books.file_books)
+            for index, book in books:
+                self.sampler.add(index, book)
+        return [self.books[index] for index in self.sampler.draw_unique(count)]
+
+    def recommend_book(self, count=1):
+        """Recommends random books from the bookshelf, weighted by rating and genre.
+
+        Args:
+            count (int): The number of different books to recommend. Defaults to 1.
+        """
+        books = self.recommend_books(count)
+        if not books:
             print("\nNo books to recommend! Add some first.")
             return
-        book = random.choice(self.books)
-        print(f"""
+        for book in books:
+            print(f"""
 Recommendation:
-  Title : {book['title']}
-  Author: {book['author']}
-  Genre : {book['genre']}
-  Rating: {'⭐' * book['rating']} ({book['rating']}/5)""")
+  Title : {book.title}
+  Author: {book.author}
+  Genre : {book.genre}
+  Rating: {'⭐' * book.rating} ({book.rating}/5)""")
 
 # Main Program
 if __name__ == "__main__":
-    bookshelf = Bookshelf()
+    bookshelf = Bookshelf(lazy="--lazy" in sys.argv[1:])
 
     while True:
         print("""
@@ -119,7 +614,11 @@ Bookshelf Manager
             bookshelf.add_book(title, author, genre)
 
         elif choice == "2":
-            bookshelf.show_bookshelf()
+            first = 1
+            bookshelf.show_bookshelf(first, PAGE_SIZE)
+            while first + PAGE_SIZE <= len(bookshelf.books) and input("\nShow more? (y/n): ").lower() == "y":
+                first += PAGE_SIZE
+                bookshelf.show_bookshelf(first, PAGE_SIZE)
 
         elif choice == "3":
             keyword = input("Enter a keyword to search: ")
@@ -0,0 +1,44 @@
+# Memory benchmark of the bookshelf's Book records against plain dictionaries
+import json
+import random
+import tracemalloc
+
+from bookshelf import book_from_json
+
+GENRES = ["Fantasy", "Science Fiction", "Crime", "Romance", "History", "Poetry"]
+
+
+def generate_bookshelf_json(count=200_000, seed=42):
+    """Generates the JSON text of a bookshelf with count books."""
+    rng = random.Random(seed)
+    return json.dumps([
+        {
+            "title": f"Book number {number}",
+            "author": f"Author {rng.randrange(1000)}",
+            "genre": rng.choice(GENRES),
+            "rating": rng.randint(1, 5),
+        }
+        for number in range(count)
+    ])
+
+
+def measure(build):
+    """Returns the bytes allocated by build() which are still in use afterwards."""
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+if __name__ == "__main__":
+    count = 200_000
+    text = generate_bookshelf_json(count)
+    layouts = {
+        "dict": lambda: json.loads(text),
+        "Book": lambda: [book_from_json(data) for data in json.loads(text)],
+    }
+    for name, build in layouts.items():
+        size = measure(build)
+        print(f"{name:5}: {size / 2**20:8.1f} MiB ({size / count:6.1f} bytes/book)")
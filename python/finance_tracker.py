@@ -1,21 +1,148 @@
+import argparse
 import csv
 import datetime
+import io
+import json
+import math
 import os
-from collections import defaultdict
-import matplotlib.pyplot as plt
+import sys
+import time
+from array import array
+from collections import defaultdict, namedtuple
+from itertools import islice
 
 # File to store the expense data
 DATA_FILE = "expenses.csv"
+# Size of the expense charts in inches
+CHART_SIZE = (8, 5)
+# Bytes read from the data file at once
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+# Bytes before the end of the parsed rows compared to tell appended rows from a rewritten file
+CACHE_CHECK_SIZE = 64
+# Rows buffered by ExpenseWriter before they are written
+FLUSH_ROWS = 10_000
+# Seconds after which ExpenseWriter writes its buffered rows with the next expense
+FLUSH_SECONDS = 1.0
+DATE_FORMAT = "%Y-%m-%d"
+# Base name of the files of the binary ledger
+LEDGER_FILE = "expenses.ledger"
+# Binary ledger columns: file suffix, array typecode and NumPy dtype (little-endian)
+LEDGER_COLUMNS = ((".days", "i", "<i4"), (".category", "H", "<u2"), (".cents", "q", "<i8"))
+EPOCH = datetime.date(1970, 1, 1)
 
-# Initialize data file with a header if it doesn't exist
-if not os.path.exists(DATA_FILE):
-    with open(DATA_FILE, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(["Date", "Category", "Amount"])
+# Suffix of the file with the rollups of a CSV file
+ROLLUP_SUFFIX = ".rollup.json"
+# Rows rolled up, or seconds passed, before a rollup kept in memory is saved again
+ROLLUP_SAVE_ROWS = 1000
+ROLLUP_SAVE_SECONDS = 10.0
+# Functions from an ISO date to the key of its period in rollup reports
+PERIOD_KEYS = {
+    "day": lambda date: date,
+    "week": lambda date: "{}-W{:02}".format(*datetime.date.fromisoformat(date).isocalendar()[:2]),
+    "month": lambda date: date[:7],
+    "year": lambda date: date[:4],
+}
+
+# Totals of the complete rows of a file, up to byte offset, when it had the given size and mtime
+CachedTotals = namedtuple("CachedTotals", "size mtime offset check totals")
+_totals_cache = {}
+_ledger = None
+
+def _numpy():
+    """
+    Import NumPy when it is first needed, as it takes longer to import than this module.
+
+    Returns:
+        module: numpy, or None if it is not installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+class Ledger:
+    """
+    The CSV file of expenses, which is only created when the first expense is written, not on import.
+
+    Reading a ledger whose file does not exist yet gives no expenses and does not create it.
+
+    Attributes:
+        file_name (str): The CSV file.
+    """
+
+    def __init__(self, file_name=None):
+        self.file_name = file_name or DATA_FILE
+        self.opened = False
+        self.expense_rollup = None
+
+    def open(self):
+        """
+        Create the CSV file with a header row if it does not exist yet, the first time it is called.
+
+        Only the methods which write expenses call it.
+
+        Returns:
+            str: The name of the CSV file.
+        """
+        if not self.opened:
+            if not os.path.exists(self.file_name):
+                with open(self.file_name, mode="w", newline="") as file:
+                    writer = csv.writer(file)
+                    writer.writerow(["Date", "Category", "Amount"])
+            self.opened = True
+        return self.file_name
+
+    def add_expense(self, date, category, amount):
+        """
+        Add a new expense to the CSV file and its rollup (see ExpenseRollup).
+
+        The rollup is loaded once per ledger and saved when it is due (see ExpenseRollup.checkpoint).
+
+        Raises:
+            ValueError: If the date is not in 'YYYY-MM-DD' format or the amount is not a finite number,
+                in which case nothing is written.
+        """
+        row, = validate_expenses([(date, category, amount)])
+        with open(self.open(), mode="a", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(row)
+        rollup = self.rollup(save=False)
+        rollup.checkpoint()
+
+    def add_expenses(self, expenses, date_format=DATE_FORMAT):
+        return add_expenses(expenses, self.open(), date_format)
+
+    def writer(self, max_rows=FLUSH_ROWS, max_seconds=FLUSH_SECONDS):
+        return ExpenseWriter(self.open(), max_rows, max_seconds)
+
+    def read_expenses(self):
+        return read_expenses(self.file_name)
+
+    def totals(self):
+        return expense_totals(self.file_name)
+
+    def rollup(self, save=True):
+        """
+        Return the rollup of the CSV file, up to date with its rows (see ExpenseRollup.update).
+        """
+        if self.expense_rollup is None:
+            self.expense_rollup = ExpenseRollup(self.file_name)
+        self.expense_rollup.update(save)
+        return self.expense_rollup
+
+def get_ledger():
+    """
+    Return the ledger of DATA_FILE used by the functions below.
+    """
+    global _ledger
+    if _ledger is None or _ledger.file_name != DATA_FILE:
+        _ledger = Ledger()
+    return _ledger
 
 def add_expense(date, category, amount):
     """
-    Add a new expense to the CSV file.
+    Add a new expense to the CSV file and its rollup (see ExpenseRollup).
 
     Parameters:
         date (str): The date of the expense in 'YYYY-MM-DD' format.
@@ -25,64 +152,745 @@ def add_expense(date, category, amount):
     Raises:
         ValueError: If the date is not in the correct format or the amount is not a valid float.
     """
-    with open(DATA_FILE, mode="a", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow([date, category, amount])
+    get_ledger().add_expense(date, category, amount)
     print("Expense added successfully.")
 
-def view_expenses():
+def validate_expenses(expenses, date_format=DATE_FORMAT, start=1):
+    """
+    Validate a batch of expenses and convert them to rows of the CSV file.
+
+    Each distinct date is parsed only once, as exports repeat the same dates many times.
+
+    Parameters:
+        expenses (iterable): (date, category, amount) tuples, the dates as strings in date_format.
+        date_format (str): The strptime format of the dates. Defaults to 'YYYY-MM-DD'.
+        start (int): The number of the first expense in error messages. Defaults to 1.
+
+    Returns:
+        list: The [date, category, amount] rows, with dates in 'YYYY-MM-DD' format and float amounts.
+
+    Raises:
+        ValueError: For the first expense with an invalid date or amount.
+    """
+    dates = {}
+    rows = []
+    for number, (date, category, amount) in enumerate(expenses, start=start):
+        try:
+            if date not in dates:
+                dates[date] = datetime.datetime.strptime(date, date_format).strftime(DATE_FORMAT)
+            value = float(amount)
+            if not math.isfinite(value):
+                raise ValueError("amount is not a finite number")
+        except (TypeError, ValueError) as error:
+            raise ValueError(f"Invalid expense {number} ({date}, {category}, {amount}): {error}") from None
+        rows.append([dates[date], category, value])
+    return rows
+
+class ExpenseWriter:
+    """
+    Append expenses to the CSV file, keeping it open and writing the rows in batches.
+
+    Buffered rows are written once max_rows are waiting or max_seconds have passed since the last
+    write, and when the writer is closed, e.g. at the end of a with block.
+
+    Attributes:
+        count (int): The number of expenses written so far.
+    """
+
+    def __init__(self, file_name=None, max_rows=FLUSH_ROWS, max_seconds=FLUSH_SECONDS):
+        self.file = open(Ledger(file_name).open(), mode="a", newline="")
+        self.writer = csv.writer(self.file)
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.rows = []
+        self.count = 0
+        self.flushed = time.monotonic()
+        self.rollup = ExpenseRollup(self.file.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def add_many(self, expenses, date_format=DATE_FORMAT):
+        """
+        Validate a batch of expenses (see validate_expenses) and buffer them.
+
+        Raises:
+            ValueError: If any expense of the batch is invalid, in which case none is added.
+        """
+        self.rows += validate_expenses(expenses, date_format, start=self.count + len(self.rows) + 1)
+        if len(self.rows) >= self.max_rows or time.monotonic() - self.flushed >= self.max_seconds:
+            self.flush()
+
+    def add(self, date, category, amount):
+        self.add_many([(date, category, amount)])
+
+    def flush(self):
+        self.writer.writerows(self.rows)
+        self.file.flush()
+        self.rollup.update(save=False)
+        self.rollup.checkpoint()
+        self.count += len(self.rows)
+        self.rows = []
+        self.flushed = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+            if self.rollup.unsaved:
+                self.rollup.save()
+
+def add_expenses(expenses, file_name=None, date_format=DATE_FORMAT):
+    """
+    Add many expenses to the CSV file, opening it only once.
+
+    Parameters:
+        expenses (iterable): (date, category, amount) tuples, the dates as strings in date_format.
+        file_name (str): The CSV file. Defaults to DATA_FILE.
+        date_format (str): The strptime format of the dates. Defaults to 'YYYY-MM-DD'.
+
+    Returns:
+        int: The number of expenses added.
+
+    Raises:
+        ValueError: If an expense has an invalid date or amount. The batches before it were added.
+    """
+    expenses = iter(expenses)
+    with ExpenseWriter(file_name) as writer:
+        while batch := list(islice(expenses, writer.max_rows)):
+            writer.add_many(batch, date_format)
+    return writer.count
+
+def _bank_expenses(rows, date_column, category_column, amount_column, decimal_comma, debits_negative):
+    columns = (date_column, category_column, amount_column)
+    for row in rows:
+        missing = [column for column in columns if row[column] is None]
+        if missing:
+            raise ValueError(f"Invalid row on line {rows.line_num}: missing {', '.join(missing)}")
+        amount = row[amount_column].strip()
+        if decimal_comma:
+            amount = amount.replace(".", "").replace(",", ".")
+        if debits_negative:
+            if not amount.startswith("-"):
+                continue  # Income
+            amount = amount[1:]
+        yield row[date_column].strip(), row[category_column], amount
+
+def import_bank_csv(file_name, date_column="Date", category_column="Category", amount_column="Amount",
+                    date_format=DATE_FORMAT, delimiter=",", decimal_comma=False, debits_negative=False):
+    """
+    Import the expenses of a CSV file exported by a bank, with a header row naming its columns.
+
+    Parameters:
+        file_name (str): The bank export.
+        date_column (str): The column with the dates. Defaults to 'Date'.
+        category_column (str): The column used as category, e.g. a description. Defaults to 'Category'.
+        amount_column (str): The column with the amounts. Defaults to 'Amount'.
+        date_format (str): The strptime format of the dates. Defaults to 'YYYY-MM-DD'.
+        delimiter (str): The field delimiter. Defaults to ','.
+        decimal_comma (bool): Whether amounts are written like 1.234,56. Defaults to False.
+        debits_negative (bool): Whether expenses have negative amounts, other rows are then skipped
+            as income. Defaults to False.
+
+    Returns:
+        int: The number of expenses imported.
+
+    Raises:
+        ValueError: If a column is missing, a row is too short or an expense has an invalid date or amount.
+            The batches before it were imported.
+    """
+    with open(file_name, mode="r", newline="", encoding="utf-8-sig") as file:
+        rows = csv.DictReader(file, delimiter=delimiter)
+        missing = {date_column, category_column, amount_column} - set(rows.fieldnames or ())
+        if missing:
+            raise ValueError(f"Missing columns in {file_name}: {', '.join(sorted(missing))}")
+        expenses = _bank_expenses(rows, date_column, category_column, amount_column, decimal_comma, debits_negative)
+        return add_expenses(expenses, date_format=date_format)
+
+def _read_line_blocks(file):
+    """
+    Read a binary file from its current position in blocks of about READ_CHUNK_SIZE bytes.
+
+    Every block ends with a line break, except a last line without one.
+    """
+    rest = b""
+    while chunk := file.read(READ_CHUNK_SIZE):
+        chunk = rest + chunk
+        end = chunk.rfind(b"\n") + 1
+        rest = chunk[end:]
+        if end:
+            yield chunk[:end]
+    if rest:
+        yield rest
+
+def _parse_rows(block):
+    """
+    Parse the CSV rows of a block of lines, empty lines giving empty rows.
+    """
+    return csv.reader(io.StringIO(block.decode("utf-8", errors="replace"), newline=""))
+
+def _add_to_totals(totals, rows):
+    for row in rows:
+        if row:
+            totals[row[1]] += float(row[2])
+
+def _seek_appended(file, offset, check):
+    """
+    Seek to offset in a binary file if the bytes before it are still check, i.e. the rows parsed up to
+    offset are unchanged and at most new rows were appended.
+
+    Returns:
+        bool: Whether the file is positioned at offset.
+    """
+    if not offset:
+        return False
+    file.seek(max(offset - len(check), 0))
+    return file.read(len(check)) == check
+
+def read_expenses(file_name=None):
+    """
+    Read the expenses from a CSV file in large blocks.
+
+    Parameters:
+        file_name (str): The CSV file. Defaults to DATA_FILE. If it does not exist there are no expenses.
+
+    Yields:
+        list: The rows of a block, each the date, category and amount of an expense as strings.
+    """
+    try:
+        file = open(file_name or DATA_FILE, mode="rb")
+    except FileNotFoundError:
+        return
+    with file:
+        file.readline()  # Skip header
+        for block in _read_line_blocks(file):
+            yield [row for row in _parse_rows(block) if row]
+
+def expense_totals(file_name=None):
+    """
+    Total the expenses of a CSV file by category.
+
+    The totals are cached per file. If its size and modification time are unchanged they are
+    returned without reading the file, and if rows were only appended since, just those are parsed.
+
+    Parameters:
+        file_name (str): The CSV file. Defaults to DATA_FILE. If it does not exist there are no expenses.
+
+    Returns:
+        dict: A dictionary with categories as keys and total amounts as values.
+    """
+    file_name = os.path.abspath(file_name or DATA_FILE)
+    try:
+        stat = os.stat(file_name)
+    except FileNotFoundError:
+        _totals_cache.pop(file_name, None)
+        return {}
+    cached = _totals_cache.get(file_name)
+    if cached and (cached.size, cached.mtime, cached.offset) == (stat.st_size, stat.st_mtime_ns, stat.st_size):
+        return dict(cached.totals)
+    with open(file_name, mode="rb") as file:
+        if cached and _seek_appended(file, cached.offset, cached.check):
+            offset, check, totals = cached.offset, cached.check, defaultdict(float, cached.totals)
+        else:
+            file.seek(0)
+            totals = defaultdict(float)
+            check = file.readline()  # Skip header
+            offset = len(check)
+        partial = None
+        for block in _read_line_blocks(file):
+            rows = _parse_rows(block)
+            if not block.endswith(b"\n"):
+                # A row still being written is counted but not cached
+                partial = defaultdict(float, totals)
+                _add_to_totals(partial, rows)
+                break
+            _add_to_totals(totals, rows)
+            offset += len(block)
+            check = (check + block)[-CACHE_CHECK_SIZE:]
+    _totals_cache[file_name] = CachedTotals(stat.st_size, stat.st_mtime_ns, offset, check[-CACHE_CHECK_SIZE:], totals)
+    return dict(totals if partial is None else partial)
+
+class ExpenseRollup:
+    """
+    Expense totals in cents by (month, category) and (day, category), saved next to the CSV file.
+
+    The rollup remembers how much of the CSV file it covers, so update only parses the rows appended
+    since. Reports and range queries add up the totals of the months they cover and only use daily
+    totals for partly covered months, without reading any expense rows.
+
+    Attributes:
+        file_name (str): The CSV file.
+        offset (int): The number of bytes of the CSV file which are rolled up.
+        check (bytes): The last bytes rolled up, to tell appended rows from a rewritten file.
+        months (dict): The totals in cents by category of each 'YYYY-MM' month.
+        days (dict): The totals in cents by category of each 'DD' day, by month.
+        skipped (int): The rows without a valid amount left out since the rollup was loaded or rebuilt.
+    """
+
+    def __init__(self, file_name=None, load=True):
+        self.file_name = file_name or DATA_FILE
+        data = {"offset": 0, "check": "", "months": {}, "days": {}}
+        if load and os.path.exists(self.file_name + ROLLUP_SUFFIX):
+            with open(self.file_name + ROLLUP_SUFFIX, mode="r", encoding="utf-8") as file:
+                data = json.load(file)
+        self.offset = data["offset"]
+        self.check = bytes.fromhex(data["check"])
+        self.months = data["months"]
+        self.days = data["days"]
+        self.skipped = 0
+        self.unsaved = 0
+        self.saved = time.monotonic()
+
+    def save(self):
+        temporary_name = self.file_name + ROLLUP_SUFFIX + ".tmp"
+        data = {"offset": self.offset, "check": self.check.hex(), "months": self.months, "days": self.days}
+        with open(temporary_name, mode="w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(temporary_name, self.file_name + ROLLUP_SUFFIX)
+        self.unsaved = 0
+        self.saved = time.monotonic()
+
+    def checkpoint(self):
+        """
+        Save the rollup once ROLLUP_SAVE_ROWS rows were rolled up or ROLLUP_SAVE_SECONDS passed since it was saved.
+
+        Rows rolled up but not saved are not lost, as a loaded rollup rolls up all rows after its saved
+        offset on its next update.
+        """
+        if self.unsaved >= ROLLUP_SAVE_ROWS or (self.unsaved and time.monotonic() - self.saved >= ROLLUP_SAVE_SECONDS):
+            self.save()
+
+    def _add_rows(self, rows):
+        for row in rows:
+            if not row:
+                continue
+            try:
+                cents = round(float(row[2]) * 100)
+            except (IndexError, ValueError, OverflowError):
+                # Rows without a finite amount, e.g. from files written before amounts were validated,
+                # are skipped so they cannot stop the rollup at their offset
+                self.skipped += 1
+                continue
+            date, category = row[0], row[1]
+            month = self.months.setdefault(date[:7], {})
+            month[category] = month.get(category, 0) + cents
+            day = self.days.setdefault(date[:7], {}).setdefault(date[8:], {})
+            day[category] = day.get(category, 0) + cents
+            self.unsaved += 1
+
+    def update(self, save=True):
+        """
+        Roll up the rows appended to the CSV file since the last update, or all rows if it was rewritten.
+
+        A CSV file which does not exist has no rows, and then the rollup is emptied but not saved.
+
+        Parameters:
+            save (bool): Whether to save the rollup if it changed. Defaults to True.
+        """
+        try:
+            file = open(self.file_name, mode="rb")
+        except FileNotFoundError:
+            self.offset, self.check, self.months, self.days = 0, b"", {}, {}
+            return
+        with file:
+            resumed = _seek_appended(file, self.offset, self.check)
+            if not resumed:
+                file.seek(0)
+                self.months, self.days, self.skipped = {}, {}, 0
+                self.check = file.readline()[-CACHE_CHECK_SIZE:]  # Skip header
+                self.offset = file.tell()
+            offset = self.offset
+            for block in _read_line_blocks(file):
+                if not block.endswith(b"\n"):
+                    break  # A row still being written
+                self._add_rows(_parse_rows(block))
+                self.offset += len(block)
+                self.check = (self.check + block)[-CACHE_CHECK_SIZE:]
+        if save and (not resumed or self.offset != offset):
+            self.save()
+
+    def _pieces(self, start, end, by_day):
+        """
+        Yield the (date, totals) pieces of the rollup from start to end, which are months given by their
+        first day where they are covered entirely, unless by_day, and days otherwise.
+        """
+        for month in sorted(self.months):
+            first, last = month + "-01", month + "-31"
+            if (start and last < start) or (end and first > end):
+                continue
+            if not by_day and (not start or start <= first) and (not end or last <= end):
+                yield first, self.months[month]
+                continue
+            for day in sorted(self.days[month]):
+                date = f"{month}-{day}"
+                if (not start or start <= date) and (not end or date <= end):
+                    yield date, self.days[month][day]
+
+    def totals(self, start=None, end=None):
+        """
+        Total the expenses by category from start to end.
+
+        Parameters:
+            start (str): The first date in 'YYYY-MM-DD' format. Defaults to the first expense.
+            end (str): The last date in 'YYYY-MM-DD' format. Defaults to the last expense.
+
+        Returns:
+            dict: A dictionary with categories as keys and total amounts as values.
+        """
+        sums = defaultdict(int)
+        for _, totals in self._pieces(start, end, by_day=False):
+            for category, cents in totals.items():
+                sums[category] += cents
+        return {category: cents / 100 for category, cents in sums.items()}
+
+    def report(self, period="month", start=None, end=None):
+        """
+        Total the expenses by period and category from start to end.
+
+        Parameters:
+            period (str): 'day', 'week', 'month' or 'year'. Defaults to 'month'.
+            start (str): The first date in 'YYYY-MM-DD' format. Defaults to the first expense.
+            end (str): The last date in 'YYYY-MM-DD' format. Defaults to the last expense.
+
+        Returns:
+            dict: The totals by category of each period, e.g. '2024-03-05', '2024-W10', '2024-03' or '2024'.
+        """
+        period_key = PERIOD_KEYS[period]
+        sums = defaultdict(lambda: defaultdict(int))
+        for date, totals in self._pieces(start, end, by_day=period in ("day", "week")):
+            period_sums = sums[period_key(date)]
+            for category, cents in totals.items():
+                period_sums[category] += cents
+        return {
+            key: {category: cents / 100 for category, cents in period_sums.items()}
+            for key, period_sums in sums.items()
+        }
+
+    def verify(self, repair=False):
+        """
+        Compare the rollup with one rebuilt from all rows of the CSV file.
+
+        Parameters:
+            repair (bool): Whether to replace the rollup with the rebuilt one if they differ. Defaults to False.
+
+        Returns:
+            bool: Whether the rollup was consistent with the CSV file.
+        """
+        self.update()
+        rebuilt = ExpenseRollup(self.file_name, load=False)
+        rebuilt.update(save=False)
+        consistent = (self.offset, self.months, self.days) == (rebuilt.offset, rebuilt.months, rebuilt.days)
+        if repair and not consistent:
+            self.offset, self.check, self.months, self.days = rebuilt.offset, rebuilt.check, rebuilt.months, rebuilt.days
+            self.save()
+        return consistent
+
+class BinaryLedger:
+    """
+    Expenses stored as binary columns, which are memory-mapped for summaries.
+
+    Each expense is the day since 1970-01-01 (int32), the id of its category (uint16) and the amount
+    in cents (int64), appended to one file per column. The categories are listed in a JSON file in
+    the order of their ids, so every category name is stored and hashed only once.
+
+    Attributes:
+        base_name (str): The column files are named base_name + ".days", ".category" and ".cents".
+        categories (list): The category names by id.
+    """
+
+    def __init__(self, base_name=LEDGER_FILE):
+        self.base_name = base_name
+        self.categories_file = base_name + ".categories.json"
+        try:
+            with open(self.categories_file, mode="r", encoding="utf-8") as file:
+                self.categories = json.load(file)
+        except FileNotFoundError:
+            self.categories = []
+        self.category_ids = {category: category_id for category_id, category in enumerate(self.categories)}
+
+    def __len__(self):
+        # Columns may differ in length after an interrupted append, the shortest one counts
+        lengths = []
+        for suffix, typecode, _ in LEDGER_COLUMNS:
+            try:
+                lengths.append(os.path.getsize(self.base_name + suffix) // array(typecode).itemsize)
+            except FileNotFoundError:
+                return 0
+        return min(lengths)
+
+    def _save_categories(self):
+        temporary_name = self.categories_file + ".tmp"
+        with open(temporary_name, mode="w", encoding="utf-8") as file:
+            json.dump(self.categories, file, ensure_ascii=False)
+        os.replace(temporary_name, self.categories_file)
+
+    def append(self, rows):
+        """
+        Append validated rows (see validate_expenses) to the ledger.
+
+        Parameters:
+            rows (iterable): [date, category, amount] rows, with dates in 'YYYY-MM-DD' format.
+
+        Raises:
+            ValueError: If there would be more categories than fit into a category id.
+        """
+        columns = [array(typecode) for _, typecode, _ in LEDGER_COLUMNS]
+        days, ids, cents = columns
+        day_numbers = {}
+        category_count = len(self.categories)
+        for date, category, amount in rows:
+            if date not in day_numbers:
+                day_numbers[date] = (datetime.date.fromisoformat(date) - EPOCH).days
+            if category not in self.category_ids:
+                if len(self.categories) > 0xFFFF:
+                    raise ValueError("Too many categories for the binary ledger")
+                self.category_ids[category] = len(self.categories)
+                self.categories.append(category)
+            days.append(day_numbers[date])
+            ids.append(self.category_ids[category])
+            cents.append(round(amount * 100))
+        # New categories are saved before any row refers to them
+        if len(self.categories) > category_count:
+            self._save_categories()
+        length = len(self)
+        for (suffix, _, _), column in zip(LEDGER_COLUMNS, columns):
+            if sys.byteorder == "big":
+                column.byteswap()
+            with open(self.base_name + suffix, mode="ab") as file:
+                # Drop the rows of an interrupted append
+                file.truncate(length * column.itemsize)
+                column.tofile(file)
+
+    def add_many(self, expenses, date_format=DATE_FORMAT):
+        """
+        Validate expenses (see validate_expenses) and append them to the ledger.
+        """
+        self.append(validate_expenses(expenses, date_format))
+
+    def columns(self):
+        """
+        Return the days, category ids and cents columns, memory-mapped with NumPy, else read into arrays.
+        """
+        length = len(self)
+        np = _numpy()
+        if np is not None:
+            return tuple(
+                np.memmap(self.base_name + suffix, dtype=dtype, mode="r", shape=(length,))
+                if length else np.empty(0, dtype=dtype)
+                for suffix, _, dtype in LEDGER_COLUMNS
+            )
+        columns = []
+        for suffix, typecode, _ in LEDGER_COLUMNS:
+            column = array(typecode)
+            if length:
+                with open(self.base_name + suffix, mode="rb") as file:
+                    column.fromfile(file, length)
+            if sys.byteorder == "big":
+                column.byteswap()
+            columns.append(column)
+        return tuple(columns)
+
+    def totals(self):
+        """
+        Total the expenses by category, with a single bincount over the category ids if NumPy is installed.
+
+        Returns:
+            dict: A dictionary with categories as keys and total amounts as values.
+        """
+        _, ids, cents = self.columns()
+        np = _numpy()
+        if np is not None:
+            counts = np.bincount(ids, minlength=len(self.categories))
+            sums = np.bincount(ids, weights=cents, minlength=len(self.categories))
+            return {
+                category: total / 100
+                for category, count, total in zip(self.categories, counts.tolist(), sums.tolist())
+                if count
+            }
+        sums = defaultdict(int)
+        for category_id, amount in zip(ids, cents):
+            sums[category_id] += amount
+        return {self.categories[category_id]: total / 100 for category_id, total in sorted(sums.items())}
+
+    def rows(self, block_size=FLUSH_ROWS):
+        """
+        Yield the [date, category, amount] rows of the ledger, decoded a block at a time.
+        """
+        days, ids, cents = self.columns()
+        dates = {}
+        for start in range(0, len(days), block_size):
+            for day, category_id, amount in zip(
+                *(column[start:start + block_size].tolist() for column in (days, ids, cents))
+            ):
+                if day not in dates:
+                    dates[day] = (EPOCH + datetime.timedelta(days=day)).isoformat()
+                yield [dates[day], self.categories[category_id], amount / 100]
+
+def csv_to_ledger(file_name=None, ledger=None):
+    """
+    Append the expenses of a CSV file to a binary ledger, a block of rows at a time.
+
+    Parameters:
+        file_name (str): The CSV file. Defaults to DATA_FILE.
+        ledger (BinaryLedger): The ledger. Defaults to one at LEDGER_FILE.
+
+    Returns:
+        BinaryLedger: The ledger.
+
+    Raises:
+        ValueError: If an expense has an invalid date or amount. The blocks before it were appended.
+    """
+    if ledger is None:
+        ledger = BinaryLedger()
+    converted = 0
+    for rows in read_expenses(file_name):
+        ledger.append(validate_expenses(rows, start=converted + 1))
+        converted += len(rows)
+    return ledger
+
+def ledger_to_csv(ledger=None, file_name=None):
+    """
+    Write all expenses of a binary ledger to a new CSV file, replacing it.
+
+    Parameters:
+        ledger (BinaryLedger): The ledger. Defaults to one at LEDGER_FILE.
+        file_name (str): The CSV file. Defaults to DATA_FILE.
+    """
+    if ledger is None:
+        ledger = BinaryLedger()
+    file_name = file_name or DATA_FILE
+    temporary_name = file_name + ".tmp"
+    with open(temporary_name, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Date", "Category", "Amount"])
+        rows = ledger.rows()
+        while batch := list(islice(rows, FLUSH_ROWS)):
+            writer.writerows(batch)
+    os.replace(temporary_name, file_name)
+
+def view_expenses(ledger=None):
     """
     Display all expenses from the CSV file.
 
     Reads and prints each expense entry in the format:
     Date: YYYY-MM-DD, Category: CategoryName, Amount: €Amount
+
+    Parameters:
+        ledger (Ledger): The ledger to display. Defaults to the one of DATA_FILE.
     """
-    with open(DATA_FILE, mode="r") as file:
-        reader = csv.reader(file)
-        next(reader)  # Skip header
-        print("\nRecorded Expenses:")
-        for row in reader:
-            print(f"Date: {row[0]}, Category: {row[1]}, Amount: €{row[2]}")
+    ledger = get_ledger() if ledger is None else ledger
+    print("\nRecorded Expenses:")
+    for rows in ledger.read_expenses():
+        sys.stdout.write("".join(f"Date: {row[0]}, Category: {row[1]}, Amount: €{row[2]}\n" for row in rows))
 
-def summarize_expenses():
+def summarize_expenses(ledger=None):
     """
     Summarize expenses by category and display the totals.
 
+    Parameters:
+        ledger (Ledger): The ledger to summarize, or a BinaryLedger. Defaults to the one of DATA_FILE.
+
     Returns:
         dict: A dictionary with categories as keys and total amounts as values.
     """
-    summary = defaultdict(float)
-    with open(DATA_FILE, mode="r") as file:
-        reader = csv.reader(file)
-        next(reader)  # Skip header
-        for row in reader:
-            summary[row[1]] += float(row[2])
-    
+    ledger = get_ledger() if ledger is None else ledger
+    summary = defaultdict(float, ledger.totals())
+
     print("\nExpense Summary by Category:")
     for category, amount in summary.items():
         print(f"{category}: €{amount:.2f}")
     
     return summary
 
-def plot_expenses():
+def _draw_expenses(axes, summary, title):
+    axes.bar(list(summary.keys()), list(summary.values()))
+    axes.set_xlabel("Category")
+    axes.set_ylabel("Amount (€)")
+    axes.set_title(title)
+    axes.tick_params(axis="x", labelrotation=45)
+
+class ChartRenderer:
+    """
+    Render expense charts to PNG or SVG files without a display, reusing a single figure.
+
+    matplotlib is imported when the first renderer is created, and the figure is drawn on an Agg
+    canvas, so many charts can be rendered in one process on a server.
+    """
+
+    def __init__(self, size=CHART_SIZE):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        # The tight layout is applied while saving, instead of in a separate drawing pass
+        self.figure = Figure(figsize=size, layout="tight")
+        FigureCanvasAgg(self.figure)
+        self.axes = self.figure.add_subplot()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.figure.clear()
+
+    def render(self, summary, output_file, title="Expenses by Category"):
+        """
+        Render a bar chart of expenses by category to a file.
+
+        Parameters:
+            summary (dict): A dictionary with categories as keys and total amounts as values.
+            output_file (str): The file, whose extension (e.g. .png or .svg) selects the format.
+            title (str): The chart title. Defaults to 'Expenses by Category'.
+        """
+        self.axes.clear()
+        _draw_expenses(self.axes, summary, title)
+        self.figure.savefig(output_file)
+
+def plot_expenses(output_file=None, ledger=None):
     """
     Generate a bar chart showing expenses by category.
 
-    Uses matplotlib to create a simple bar chart visualizing the expense summary.
+    Uses matplotlib, imported only when plotting, to create a simple bar chart visualizing the expense summary.
+
+    Parameters:
+        output_file (str): Save the chart to this PNG or SVG file without a display instead of showing it.
+            Defaults to None.
+        ledger (Ledger): The ledger to plot, or a BinaryLedger. Defaults to the one of DATA_FILE.
     """
-    summary = summarize_expenses()
-    categories = list(summary.keys())
-    amounts = list(summary.values())
+    summary = summarize_expenses(ledger)
+    if output_file:
+        ChartRenderer().render(summary, output_file)
+        return
+    import matplotlib.pyplot as plt
 
-    plt.figure(figsize=(8, 5))
-    plt.bar(categories, amounts)
-    plt.xlabel("Category")
-    plt.ylabel("Amount (€)")
-    plt.title("Expenses by Category")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    figure, axes = plt.subplots(figsize=CHART_SIZE)
+    _draw_expenses(axes, summary, "Expenses by Category")
+    figure.tight_layout()
     plt.show()
 
+def plot_expense_reports(report, directory=".", file_format="png"):
+    """
+    Render a chart of expenses by category for every period of a report, reusing one figure.
+
+    Parameters:
+        report (dict): The totals by category of each period, e.g. from ExpenseRollup.report.
+        directory (str): The directory of the charts, named expenses-<period>.<file_format>. Defaults to '.'.
+        file_format (str): 'png' or 'svg'. Defaults to 'png'.
+
+    Returns:
+        list: The names of the chart files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    file_names = []
+    with ChartRenderer() as renderer:
+        for period, summary in report.items():
+            file_name = os.path.join(directory, f"expenses-{period}.{file_format}")
+            renderer.render(summary, file_name, f"Expenses by Category {period}")
+            file_names.append(file_name)
+    return file_names
+
 def main():
     """
     Main function providing a menu interface for the Personal Finance Tracker.
@@ -92,7 +900,8 @@ def main():
         2. View Expenses
         3. Summarize Expenses
         4. Plot Expenses
-        5. Exit
+        5. Import Bank CSV
+        6. Exit
     """
     while True:
         print("\nPersonal Finance Tracker")
@@ -100,9 +909,10 @@ def main():
         print("2. View Expenses")
         print("3. Summarize Expenses")
         print("4. Plot Expenses")
-        print("5. Exit")
+        print("5. Import Bank CSV")
+        print("6. Exit")
 
-        choice = input("Choose an option (1-5): ")
+        choice = input("Choose an option (1-6): ")
         
         if choice == "1":
             date = input("Enter date (YYYY-MM-DD): ")
@@ -120,11 +930,51 @@ def main():
         elif choice == "4":
             plot_expenses()
         elif choice == "5":
+            file_name = input("Enter bank CSV file (columns Date, Category, Amount): ")
+            try:
+                print(f"{import_bank_csv(file_name)} expenses imported successfully.")
+            except (OSError, ValueError) as error:
+                print(f"Import failed: {error}")
+        elif choice == "6":
             print("Exiting. Goodbye!")
             break
         else:
             print("Invalid option. Please try again.")
 
+def import_main(argv=None):
+    """
+    Command line interface importing a bank CSV export (see import_bank_csv).
+    """
+    parser = argparse.ArgumentParser(description="Import the expenses of a bank CSV export.")
+    parser.add_argument("file", help="bank CSV export with a header row")
+    parser.add_argument("--date-column", default="Date")
+    parser.add_argument("--category-column", default="Category")
+    parser.add_argument("--amount-column", default="Amount")
+    parser.add_argument("--date-format", default=DATE_FORMAT, help="strptime format of the dates")
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--decimal-comma", action="store_true", help="amounts are written like 1.234,56")
+    parser.add_argument(
+        "--debits-negative", action="store_true", help="expenses are negative amounts, skip other rows"
+    )
+    arguments = parser.parse_args(argv)
+    try:
+        count = import_bank_csv(
+            arguments.file,
+            arguments.date_column,
+            arguments.category_column,
+            arguments.amount_column,
+            arguments.date_format,
+            arguments.delimiter,
+            arguments.decimal_comma,
+            arguments.debits_negative,
+        )
+    except (OSError, ValueError) as error:
+        parser.exit(1, f"Import failed: {error}\n")
+    print(f"{count} expenses imported successfully.")
+
 # Entry point of the script
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        import_main()
+    else:
+        main()
@@ -0,0 +1,66 @@
+# Import time of finance_tracker with python -X importtime, in fresh interpreters and empty directories
+# Usage: finance_tracker_benchmark.py [REVISION [RUNS]]
+# With a git revision, its finance_tracker.py is measured as well, e.g. to compare before and after a change.
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUNS = 20
+# Lines of -X importtime look like "import time:  self [us] | cumulative | imported package"
+IMPORT_TIME = re.compile(r"import time:\s*\d+\s*\|\s*(\d+)\s*\|\s*finance_tracker$")
+
+
+def import_time(source, runs=RUNS):
+    """
+    Imports finance_tracker from source code runs times.
+
+    Returns the median cumulative import time in milliseconds and the files the import created
+    in the working directory.
+    """
+    with tempfile.TemporaryDirectory() as module_directory, tempfile.TemporaryDirectory() as working_directory:
+        with open(os.path.join(module_directory, "finance_tracker.py"), "w", encoding="utf-8") as file:
+            file.write(source)
+        path = os.pathsep.join(filter(None, [module_directory, os.environ.get("PYTHONPATH")]))
+        environment = dict(os.environ, PYTHONPATH=path)
+        times = []
+        for _ in range(runs):
+            result = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", "import finance_tracker"],
+                cwd=working_directory,
+                env=environment,
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode:
+                raise RuntimeError(result.stderr.strip().splitlines()[-1])
+            times += [int(match.group(1)) / 1000 for match in map(IMPORT_TIME.match, result.stderr.splitlines()) if match]
+        return statistics.median(times), sorted(os.listdir(working_directory))
+
+
+def benchmark(name, source, runs):
+    try:
+        milliseconds, created = import_time(source, runs)
+    except RuntimeError as error:
+        print(f"{name:>12}: import failed ({error})")
+        return
+    print(f"{name:>12}: {milliseconds:8.1f} ms, files created on import: {', '.join(created) or 'none'}")
+
+
+if __name__ == "__main__":
+    directory = os.path.dirname(os.path.abspath(__file__))
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else RUNS
+    if len(sys.argv) > 1:
+        revision = sys.argv[1]
+        source = subprocess.run(
+            ["git", "show", f"{revision}:./finance_tracker.py"],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        benchmark(revision, source, runs)
+    with open(os.path.join(directory, "finance_tracker.py"), encoding="utf-8") as file:
+        benchmark("current", file.read(), runs)
@@ -1,15 +1,39 @@
 # This is a simple Austrian NoVA calculator
-from collections import namedtuple
+import argparse
+import csv
+import itertools
+import math
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 VAT = 0.2
 QUANTIZATION_OBJECT = Decimal("1.00")
+# Deduction cents checked on each side of the closed-form estimate
+NOVA_NET_WINDOW = 4
+# Rows priced per chunk in bulk mode
+BULK_CHUNK_SIZE = 10_000
+BULK_COLUMNS = ("year", "price", "co2", "vat", "direction")
+# Highest co2 value (g/km) covered by the per-year lookup tables
+NOVA_TABLE_CO2_MAX = 500
 
 Parameter = namedtuple(
     "Parameter",
     "co2_deduction deduction_amount co2_limit additional_costs tax_rate_max",
 )
 
+NovaTable = namedtuple("NovaTable", "parameters rate_percents rates bonus_malus")
+
+BulkResult = namedtuple("BulkResult", "rows errors")
+
 PARAMETERS_LIST = {
     2021: Parameter(
         112,
@@ -49,6 +73,62 @@ PARAMETERS_LIST = {
 }
 
 
+def _nova_rate_percent(co2_value, parameters):
+    return Decimal(
+        f"{min(max(co2_value-parameters.co2_deduction, 0)/500, parameters.tax_rate_max)*100}"
+    ).quantize(QUANTIZATION_OBJECT)
+
+
+def _nova_rate(co2_value, parameters):
+    return Decimal(
+        f"{min(max(co2_value-parameters.co2_deduction, 0)/500, parameters.tax_rate_max)}"
+    ).quantize(QUANTIZATION_OBJECT)
+
+
+def _bonus_malus(co2_value, parameters):
+    return Decimal(
+        Decimal(co2_value - parameters.co2_limit) * parameters.additional_costs
+        if co2_value > parameters.co2_limit
+        else 0
+    )
+
+
+_nova_tables = {}
+
+
+def get_nova_table(year: int) -> NovaTable:
+    """Returns the year's NoVA rates and bonus-malus for every whole co2 value.
+
+    The table is built on first use and rebuilt whenever the year's entry in
+    PARAMETERS_LIST is replaced, so registering new parameters is enough.
+    >>> table = get_nova_table(2022)
+    >>> table.rate_percents[185], table.rates[185], table.bonus_malus[200]
+    (Decimal('15.60'), Decimal('0.16'), Decimal('900.00'))
+    """
+    parameters = PARAMETERS_LIST.get(year)
+    if not parameters:
+        raise ValueError(f"Parameters for year {year} are not available!")
+    table = _nova_tables.get(year)
+    if table is None or table.parameters is not parameters:
+        co2_values = range(NOVA_TABLE_CO2_MAX + 1)
+        table = _nova_tables[year] = NovaTable(
+            parameters,
+            tuple(_nova_rate_percent(co2, parameters) for co2 in co2_values),
+            tuple(_nova_rate(co2, parameters) for co2 in co2_values),
+            tuple(_bonus_malus(co2, parameters) for co2 in co2_values),
+        )
+    return table
+
+
+def _table_co2(co2_value):
+    """Returns co2_value as a table index, or None if it is not covered."""
+    if isinstance(co2_value, float) and co2_value.is_integer():
+        co2_value = int(co2_value)
+    if isinstance(co2_value, int) and 0 <= co2_value <= NOVA_TABLE_CO2_MAX:
+        return co2_value
+    return None
+
+
 def get_nova_rate(
     *,
     year: int = None,
@@ -56,11 +136,9 @@ def get_nova_rate(
 ):
     if not year or not co2_value:
         return None
-    parameters = PARAMETERS_LIST.get(year)
-    nova_rate = Decimal(
-        f"{min(max(co2_value-parameters.co2_deduction, 0)/500, parameters.tax_rate_max)*100}"
-    ).quantize(QUANTIZATION_OBJECT)
-    return nova_rate
+    if (index := _table_co2(co2_value)) is not None:
+        return get_nova_table(year).rate_percents[index]
+    return _nova_rate_percent(co2_value, PARAMETERS_LIST.get(year))
 
 
 def read_nova_parameters(
@@ -86,15 +164,15 @@ def read_nova_parameters(
         co2_value = float(
             input("Please enter car's co2 value: ").replace(",", ".")
         )
-    parameters = PARAMETERS_LIST.get(year)
-    nova_rate = Decimal(
-        f"{min(max(co2_value-parameters.co2_deduction, 0)/500, parameters.tax_rate_max)}"
-    ).quantize(QUANTIZATION_OBJECT)
-    bonus_malus = Decimal(
-        Decimal(co2_value - parameters.co2_limit) * parameters.additional_costs
-        if co2_value > parameters.co2_limit
-        else 0
-    )
+    if (index := _table_co2(co2_value)) is not None:
+        table = get_nova_table(year)
+        parameters = table.parameters
+        nova_rate = table.rates[index]
+        bonus_malus = table.bonus_malus[index]
+    else:
+        parameters = PARAMETERS_LIST.get(year)
+        nova_rate = _nova_rate(co2_value, parameters)
+        bonus_malus = _bonus_malus(co2_value, parameters)
     return car_price, co2_value, parameters, vat, nova_rate, bonus_malus
 
 
@@ -172,28 +250,549 @@ def calculate_nova_net(
     ) = read_nova_parameters(
         year=year, car_price=gross_price, co2_value=co2_value, vat=vat
     )
-    for deduction_amount in range(
-        0, (parameters.deduction_amount * 100) + 1, 1
-    ):
-        deduction_amount /= 100
-        deduction_amount = Decimal(deduction_amount)
-        net_price = (gross_price - bonus_malus + deduction_amount) / (
-            1 + vat + nova_rate
-        )
-        nova_value = Decimal(f"{net_price * nova_rate}").quantize(
-            QUANTIZATION_OBJECT
-        )
-        check_sum = nova_value + bonus_malus - deduction_amount
-        if check_sum == 0 or (
-            check_sum < 0 and check_sum == nova_value - deduction_amount
-        ):
-            return net_price.quantize(QUANTIZATION_OBJECT)
+    return _solve_nova_net(
+        gross_price, parameters, vat, nova_rate, bonus_malus
+    )
+
+
+def _nova_net_step(cents, gross_price, vat, nova_rate, bonus_malus):
+    """Evaluate one deduction candidate of the gross>net search.
+
+    Returns the unquantized net price for a deduction of `cents` / 100 and
+    whether that deduction balances the NoVA equation.
+    """
+    deduction_amount = Decimal(cents / 100)
+    net_price = (gross_price - bonus_malus + deduction_amount) / (
+        1 + vat + nova_rate
+    )
+    nova_value = Decimal(f"{net_price * nova_rate}").quantize(
+        QUANTIZATION_OBJECT
+    )
+    check_sum = nova_value + bonus_malus - deduction_amount
+    return net_price, check_sum == 0 or (
+        check_sum < 0 and check_sum == nova_value - deduction_amount
+    )
+
+
+def _nova_net_fallback(gross_price, parameters, vat, nova_rate, bonus_malus):
     return Decimal(
         (gross_price + parameters.deduction_amount - bonus_malus)
         / (1 + vat + nova_rate)
     ).quantize(QUANTIZATION_OBJECT)
 
 
+def _scan_nova_net(gross_price, parameters, vat, nova_rate, bonus_malus):
+    """Reference solver: tries every deduction cent from 0 upwards."""
+    for cents in range(0, (parameters.deduction_amount * 100) + 1, 1):
+        net_price, balanced = _nova_net_step(
+            cents, gross_price, vat, nova_rate, bonus_malus
+        )
+        if balanced:
+            return net_price.quantize(QUANTIZATION_OBJECT)
+    return _nova_net_fallback(
+        gross_price, parameters, vat, nova_rate, bonus_malus
+    )
+
+
+def _solve_nova_net(gross_price, parameters, vat, nova_rate, bonus_malus):
+    """Closed-form solver returning the same result as `_scan_nova_net`.
+
+    The deduction balancing the NoVA equation is
+    bonus_malus + gross_price * nova_rate / (1 + vat). The rounded NoVA value
+    moves by less than a cent per deduction cent, so no deduction more than
+    NOVA_NET_WINDOW cents below that point can balance, and (without
+    bonus-malus) every deduction more than NOVA_NET_WINDOW cents above it
+    does. Only the cents around the estimate need to be checked.
+    """
+    max_cents = parameters.deduction_amount * 100
+    estimate = int(
+        (bonus_malus + gross_price * nova_rate / (1 + vat)) * 100
+    )
+    start = max(estimate - NOVA_NET_WINDOW, 0)
+    stop = max_cents if bonus_malus == 0 else min(
+        estimate + NOVA_NET_WINDOW, max_cents
+    )
+    for cents in range(start, stop + 1):
+        net_price, balanced = _nova_net_step(
+            cents, gross_price, vat, nova_rate, bonus_malus
+        )
+        if balanced:
+            return net_price.quantize(QUANTIZATION_OBJECT)
+    return _nova_net_fallback(
+        gross_price, parameters, vat, nova_rate, bonus_malus
+    )
+
+
+def _round_half_even(numerator, denominator, error=0):
+    """Divide integers (or integer arrays) rounding like Decimal.quantize.
+
+    A positive or negative error marks a numerator that is slightly off its
+    exact value and decides ties in that direction.
+    """
+    quotient, remainder = divmod(numerator, denominator)
+    return quotient + (
+        (2 * remainder > denominator)
+        | (
+            (2 * remainder == denominator)
+            & ((error > 0) | ((error == 0) & (quotient % 2 == 1)))
+        )
+    )
+
+
+def _to_cents(value):
+    return int(round(value * 100))
+
+
+@lru_cache
+def _deduction_float_errors(max_cents):
+    """Sign of Decimal(cents / 100) - cents / 100 for every deduction cent.
+
+    calculate_nova_net steps through deductions as binary floats, so a
+    deduction that exactly balances the NoVA equation only counts as such
+    when its float lands on or above the exact value.
+    """
+    return tuple(
+        int(Decimal(cents / 100).compare(Decimal(cents) / 100))
+        for cents in range(max_cents + 1)
+    )
+
+
+def _cent_parameters(year):
+    """Returns the year's parameters as whole cents, percents and g/km."""
+    parameters = PARAMETERS_LIST.get(year)
+    if not parameters:
+        raise ValueError(f"Parameters for year {year} are not available!")
+    return (
+        parameters.co2_deduction,
+        parameters.deduction_amount * 100,
+        parameters.co2_limit,
+        int(parameters.additional_costs * 100),
+        int(parameters.tax_rate_max * 100),
+    )
+
+
+def _nova_rate_and_bonus_malus(co2_value, cent_parameters):
+    co2_deduction, _, co2_limit, additional_costs, tax_rate_max = (
+        cent_parameters
+    )
+    nova_rate = min(
+        _round_half_even(max(co2_value - co2_deduction, 0), 5), tax_rate_max
+    )
+    bonus_malus = max(co2_value - co2_limit, 0) * additional_costs
+    return nova_rate, bonus_malus
+
+
+def _nova_gross_cents(net_price, co2_value, vat, cent_parameters):
+    """NoVA gross price in cents; net_price in cents, vat in basis points.
+
+    All terms are scaled by 10000 so the sum stays an exact integer and is
+    rounded once, like the quantization in calculate_nova_gross.
+    """
+    nova_rate, bonus_malus = _nova_rate_and_bonus_malus(
+        co2_value, cent_parameters
+    )
+    nova_value = net_price * nova_rate * 100 + 10000 * (
+        bonus_malus - cent_parameters[1]
+    )
+    return _round_half_even(
+        net_price * (10000 + vat) + max(nova_value, 0), 10000
+    )
+
+
+def _nova_net_cents(gross_price, co2_value, vat, cent_parameters):
+    """Net price in cents, solved like calculate_nova_net in whole cents."""
+    deduction_amount = cent_parameters[1]
+    nova_rate, bonus_malus = _nova_rate_and_bonus_malus(
+        co2_value, cent_parameters
+    )
+    float_errors = _deduction_float_errors(deduction_amount)
+    denominator = 10000 + vat + 100 * nova_rate
+    estimate = bonus_malus + gross_price * nova_rate * 100 // (10000 + vat)
+    for cents in range(
+        max(estimate - NOVA_NET_WINDOW, 0),
+        min(estimate + NOVA_NET_WINDOW, deduction_amount) + 1,
+    ):
+        nova_value = _round_half_even(
+            (gross_price - bonus_malus + cents) * nova_rate * 100,
+            denominator,
+            float_errors[cents],
+        )
+        check_sum = nova_value + bonus_malus - cents
+        if check_sum == 0 and float_errors[cents] == 0:
+            balanced = True
+        else:
+            balanced = bonus_malus == 0 and (
+                check_sum < 0 or (check_sum == 0 and float_errors[cents] > 0)
+            )
+        if balanced:
+            return _round_half_even(
+                (gross_price - bonus_malus + cents) * 10000,
+                denominator,
+                float_errors[cents],
+            )
+    return _round_half_even(
+        (gross_price + deduction_amount - bonus_malus) * 10000, denominator
+    )
+
+
+def _cent_parameter_columns(years):
+    """Resolves the parameters once per distinct year into int64 columns."""
+    distinct_years, row_year = np.unique(years, return_inverse=True)
+    table = np.array(
+        [_cent_parameters(int(year)) for year in distinct_years],
+        dtype=np.int64,
+    ).reshape(-1, 5)
+    return table[row_year.reshape(-1)].T
+
+
+def _nova_rate_and_bonus_malus_array(co2_values, columns):
+    co2_deduction, _, co2_limit, additional_costs, tax_rate_max = columns
+    nova_rate = np.minimum(
+        _round_half_even(np.maximum(co2_values - co2_deduction, 0), 5),
+        tax_rate_max,
+    )
+    bonus_malus = np.maximum(co2_values - co2_limit, 0) * additional_costs
+    return nova_rate, bonus_malus
+
+
+def _nova_gross_cents_array(net_prices, co2_values, vats, columns):
+    nova_rate, bonus_malus = _nova_rate_and_bonus_malus_array(
+        co2_values, columns
+    )
+    nova_value = net_prices * nova_rate * 100 + 10000 * (
+        bonus_malus - columns[1]
+    )
+    return _round_half_even(
+        net_prices * (10000 + vats) + np.maximum(nova_value, 0), 10000
+    )
+
+
+def _nova_net_cents_array(gross_prices, co2_values, vats, columns):
+    deduction_amount = columns[1]
+    nova_rate, bonus_malus = _nova_rate_and_bonus_malus_array(
+        co2_values, columns
+    )
+    denominator = 10000 + vats + 100 * nova_rate
+    estimate = bonus_malus + gross_prices * nova_rate * 100 // (10000 + vats)
+    # One column per deduction cent around the estimate, checked at once
+    cents = estimate[:, None] + np.arange(
+        -NOVA_NET_WINDOW, NOVA_NET_WINDOW + 1
+    )
+    valid = (cents >= 0) & (cents <= deduction_amount[:, None])
+    float_errors = np.array(
+        _deduction_float_errors(int(deduction_amount.max(initial=0))),
+        dtype=np.int8,
+    )[np.where(valid, cents, 0)]
+    base = (gross_prices - bonus_malus)[:, None]
+    nova_value = _round_half_even(
+        (base + cents) * (nova_rate * 100)[:, None],
+        denominator[:, None],
+        float_errors,
+    )
+    check_sum = nova_value + bonus_malus[:, None] - cents
+    balanced = valid & (
+        ((check_sum == 0) & (float_errors == 0))
+        | (
+            (bonus_malus == 0)[:, None]
+            & ((check_sum < 0) | ((check_sum == 0) & (float_errors > 0)))
+        )
+    )
+    first = balanced.argmax(axis=1)
+    rows = np.arange(len(cents))
+    return np.where(
+        balanced[rows, first],
+        _round_half_even(
+            (base[:, 0] + cents[rows, first]) * 10000,
+            denominator,
+            float_errors[rows, first],
+        ),
+        _round_half_even(
+            (gross_prices + deduction_amount - bonus_malus) * 10000,
+            denominator,
+        ),
+    )
+
+
+def _calculate_nova_batch(years, prices, co2_values, vat, scalar, vectorized):
+    if np is None:
+        if any(co2_value != int(co2_value) for co2_value in co2_values):
+            raise ValueError("Batch calculation needs whole co2 values!")
+        if isinstance(vat, (int, float, Decimal)):
+            vat = [vat] * len(years)
+        cent_parameters = {year: _cent_parameters(year) for year in set(years)}
+        return [
+            scalar(
+                _to_cents(price),
+                int(co2_value),
+                int(round(row_vat * 10000)),
+                cent_parameters[year],
+            )
+            for year, price, co2_value, row_vat in zip(
+                years, prices, co2_values, vat
+            )
+        ]
+    co2_values = np.asarray(co2_values, dtype=np.float64)
+    if np.any(co2_values != np.round(co2_values)):
+        raise ValueError("Batch calculation needs whole co2 values!")
+    prices = np.asarray(prices, dtype=np.float64)
+    return vectorized(
+        np.rint(prices * 100).astype(np.int64),
+        co2_values.astype(np.int64),
+        np.broadcast_to(
+            np.rint(np.asarray(vat, dtype=np.float64) * 10000).astype(np.int64),
+            prices.shape,
+        ),
+        _cent_parameter_columns(np.asarray(years, dtype=np.int64)),
+    )
+
+
+def calculate_nova_gross_batch(*, years, net_prices, co2_values, vat=VAT):
+    """Calculate the NoVA gross prices of many cars at once, in cents.
+
+    The columns can be NumPy arrays or sequences, vat can be a single value
+    or a column. Prices are taken in whole cents and vat in basis points;
+    for such values the results equal calculate_nova_gross given exact
+    Decimals. With NumPy installed the result is an int64 array, otherwise
+    a list of ints.
+    >>> gross_prices = calculate_nova_gross_batch(
+    ...     years=[2022] * 5,
+    ...     net_prices=[17000] * 5,
+    ...     co2_values=[0, 110, 185, 200, 250],
+    ... )
+    >>> [int(cents) for cents in gross_prices]
+    [2040000, 2040000, 2277000, 2418000, 2888000]
+    >>> calculate_nova_gross_batch(years=[2020], net_prices=[1], co2_values=[1])
+    Traceback (most recent call last):
+    ...
+    ValueError: Parameters for year 2020 are not available!
+    """
+    return _calculate_nova_batch(
+        years,
+        net_prices,
+        co2_values,
+        vat,
+        _nova_gross_cents,
+        _nova_gross_cents_array,
+    )
+
+
+def calculate_nova_net_batch(*, years, gross_prices, co2_values, vat=VAT):
+    """Calculate the net prices of many cars from their NoVA gross prices.
+
+    Works like calculate_nova_gross_batch, results are in cents.
+    >>> net_prices = calculate_nova_net_batch(
+    ...     years=[2022] * 5,
+    ...     gross_prices=[20400, 20400, 22770, 24180, 28880],
+    ...     co2_values=[0, 110, 185, 200, 250],
+    ... )
+    >>> [int(cents) for cents in net_prices]
+    [1700000, 1700000, 1700000, 1700000, 1700000]
+    """
+    return _calculate_nova_batch(
+        years,
+        gross_prices,
+        co2_values,
+        vat,
+        _nova_net_cents,
+        _nova_net_cents_array,
+    )
+
+
+def _format_cents(cents):
+    return str(Decimal(int(cents)).scaleb(-2))
+
+
+def _parse_bulk_row(row):
+    """Converts a (year, price, co2, vat, direction) string row.
+
+    Raises ValueError for missing or invalid values.
+    """
+    if None in row:
+        raise ValueError("Missing columns!")
+    year, price, co2_value, vat, direction = row
+    year = int(year)
+    if not PARAMETERS_LIST.get(year):
+        raise ValueError(f"Parameters for year {year} are not available!")
+    if direction not in ("n", "g"):
+        raise ValueError(f"Unknown mode: {direction}")
+    numbers = float(price), float(co2_value), float(vat)
+    if not all(map(math.isfinite, numbers)):
+        raise ValueError("Price, co2 and vat need to be finite numbers!")
+    if numbers[0] <= 0:
+        raise ValueError("Price needs to be positive!")
+    return year, Decimal(price), *numbers[1:], direction
+
+
+def price_bulk_chunk(rows):
+    """Prices a chunk of (year, price, co2, vat, direction) string rows.
+
+    Direction "n" converts the net price to the NoVA gross price, "g" the
+    gross price to the net price. Rows with whole co2 values are priced in
+    batches, others one by one like the interactive calculator. Returns the
+    rows with the result and an error column appended; rows which cannot be
+    priced get an empty result and the reason as error.
+    """
+    results = [""] * len(rows)
+    errors = [""] * len(rows)
+    batches = {"n": [], "g": []}
+    for i, row in enumerate(rows):
+        try:
+            year, price, co2_value, vat, direction = _parse_bulk_row(row)
+            if co2_value.is_integer():
+                batches[direction].append((i, year, price, co2_value, vat))
+            elif direction == "n":
+                results[i] = str(
+                    calculate_nova_gross(
+                        year=year, net_price=price, co2_value=co2_value, vat=vat
+                    )
+                )
+            else:
+                results[i] = str(
+                    calculate_nova_net(
+                        year=year, gross_price=price, co2_value=co2_value, vat=vat
+                    )
+                )
+        except ValueError as error:
+            errors[i] = str(error)
+    for direction, calculate, price_keyword in (
+        ("n", calculate_nova_gross_batch, "net_prices"),
+        ("g", calculate_nova_net_batch, "gross_prices"),
+    ):
+        if not batches[direction]:
+            continue
+        indices, years, prices, co2_values, vats = zip(*batches[direction])
+        prices = calculate(
+            years=years,
+            co2_values=co2_values,
+            vat=vats,
+            **{price_keyword: [float(price) for price in prices]},
+        )
+        for i, cents in zip(indices, prices):
+            results[i] = _format_cents(cents)
+    return [[*row, result, error] for row, result, error in zip(rows, results, errors)]
+
+
+def _read_bulk_chunks(input_file, chunk_size):
+    """Yields chunks of (line numbers, rows) of a bulk CSV, missing values are None."""
+    reader = csv.reader(input_file)
+    header = [column.strip().lower() for column in next(reader, [])]
+    try:
+        indices = [header.index(column) for column in BULK_COLUMNS]
+    except ValueError:
+        raise ValueError(
+            f"Bulk input needs the columns {', '.join(BULK_COLUMNS)}!"
+        ) from None
+    while True:
+        line_numbers = []
+        chunk = []
+        for row in itertools.islice(reader, chunk_size):
+            line_numbers.append(reader.line_num)
+            chunk.append([row[i].strip() if i < len(row) else None for i in indices])
+        if not chunk:
+            return
+        yield line_numbers, chunk
+
+
+def price_bulk(
+    input_file,
+    output_file,
+    chunk_size=BULK_CHUNK_SIZE,
+    workers=0,
+    error_file=sys.stderr,
+):
+    """Streams a priced copy of a bulk CSV from input_file to output_file.
+
+    Chunks are priced in a pool of `workers` processes if workers > 0, with
+    at most two chunks per worker in flight so memory stays constant. Rows
+    which cannot be priced keep going with their reason in the error column
+    and are reported to error_file with their input line number.
+    Returns a BulkResult with the number of rows and of rows with errors.
+    """
+    writer = csv.writer(output_file)
+    writer.writerow([*BULK_COLUMNS, "result", "error"])
+    row_count = error_count = 0
+
+    def write(line_numbers, priced):
+        nonlocal row_count, error_count
+        writer.writerows(priced)
+        row_count += len(priced)
+        for line_number, row in zip(line_numbers, priced):
+            if row[-1]:
+                error_count += 1
+                print(f"Line {line_number}: {row[-1]}", file=error_file)
+
+    chunks = _read_bulk_chunks(input_file, chunk_size)
+    if workers <= 0:
+        for line_numbers, chunk in chunks:
+            write(line_numbers, price_bulk_chunk(chunk))
+        return BulkResult(row_count, error_count)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for line_numbers, chunk in chunks:
+            pending.append((line_numbers, executor.submit(price_bulk_chunk, chunk)))
+            if len(pending) >= 2 * workers:
+                line_numbers, future = pending.popleft()
+                write(line_numbers, future.result())
+        while pending:
+            line_numbers, future = pending.popleft()
+            write(line_numbers, future.result())
+    return BulkResult(row_count, error_count)
+
+
+def bulk_main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Price a CSV of cars with the NoVA calculator."
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="CSV with the columns year, price, co2, vat, direction "
+        "(n: net>gross, g: gross>net); '-' reads stdin",
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="result CSV; '-' writes stdout"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=BULK_CHUNK_SIZE, help="rows per chunk"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0, help="worker processes (0: none)"
+    )
+    arguments = parser.parse_args(argv)
+
+    input_file = (
+        sys.stdin
+        if arguments.input == "-"
+        else open(arguments.input, newline="")
+    )
+    output_file = (
+        sys.stdout
+        if arguments.output == "-"
+        else open(arguments.output, "w", newline="")
+    )
+    start = time.perf_counter()
+    try:
+        row_count, error_count = price_bulk(
+            input_file, output_file, arguments.chunk_size, arguments.workers
+        )
+    except ValueError as error:
+        parser.exit(1, f"{error}\n")
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    seconds = time.perf_counter() - start
+    print(
+        f"Priced {row_count} rows in {seconds:.2f}s "
+        f"({row_count / seconds if seconds else 0:.0f} rows/s)",
+        file=sys.stderr,
+    )
+    if error_count:
+        parser.exit(1, f"{error_count} rows could not be priced, see the error column.\n")
+
+
 def main():
     available_modes = {"n": "[n]et>gross", "g": "[g]ross>net"}
     while chosen_mode := input(
@@ -214,4 +813,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        bulk_main()
+    else:
+        main()
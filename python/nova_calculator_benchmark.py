@@ -0,0 +1,52 @@
+# Benchmark of the NoVA gross>net solvers: full deduction scan vs closed form
+import random
+import timeit
+
+from nova_calculator import (
+    PARAMETERS_LIST,
+    _scan_nova_net,
+    _solve_nova_net,
+    read_nova_parameters,
+)
+
+
+def generate_cars(count=20, seed=42):
+    """Generates random (gross price, co2 value, parameters...) tuples."""
+    rng = random.Random(seed)
+    return [
+        read_nova_parameters(
+            year=rng.choice(list(PARAMETERS_LIST)),
+            car_price=rng.randint(5_000, 90_000),
+            co2_value=rng.randint(0, 250),
+            vat=0.2,
+        )
+        for _ in range(count)
+    ]
+
+
+def benchmark(cars, repeat=1):
+    """Times both solvers on the given cars and checks they agree."""
+    for gross_price, _, parameters, vat, nova_rate, bonus_malus in cars:
+        arguments = (gross_price, parameters, vat, nova_rate, bonus_malus)
+        if _scan_nova_net(*arguments) != _solve_nova_net(*arguments):
+            raise AssertionError(f"Solvers disagree for {arguments}")
+
+    for solver in (_scan_nova_net, _solve_nova_net):
+        seconds = min(
+            timeit.repeat(
+                lambda: [
+                    solver(gross_price, parameters, vat, nova_rate, bonus_malus)
+                    for gross_price, _, parameters, vat, nova_rate, bonus_malus in cars
+                ],
+                number=1,
+                repeat=repeat,
+            )
+        )
+        print(
+            f"{solver.__name__:16}: {seconds * 1000:9.2f} ms "
+            f"({len(cars) / seconds:12.1f} cars/s)"
+        )
+
+
+if __name__ == "__main__":
+    benchmark(generate_cars())
@@ -1,17 +1,147 @@
+import math
 import random
-from collections import Counter, namedtuple
+from collections import Counter, deque, namedtuple
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
 from itertools import cycle, islice
-from statistics import mean, median, mode, stdev
+from statistics import StatisticsError, mean, median, mode, stdev
+
+from text_histogram import render_histogram
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Define a named tuple for data insights
 DataInsights = namedtuple('DataInsights', 'mean median mode stdev most_common')
 
-def generate_data(size=100, range_start=1, range_end=50):
-    """Generates a random dataset."""
-    return [random.randint(range_start, range_end) for _ in range(size)]
+# Values generated per chunk by generate_data_chunks, fixed so the output only depends on the seed
+CHUNK_SIZE = 1 << 20
+# Values of a NumPy dataset searched at once for the first occurrences of tied values
+FIRST_OCCURRENCE_BLOCK = 1 << 20
+# Integer datasets are counted with np.bincount up to this range of values per value, or BINCOUNT_MIN_SPAN
+BINCOUNT_SPAN_FACTOR = 4
+BINCOUNT_MIN_SPAN = 1 << 16
+
+def generate_data(size=100, range_start=1, range_end=50, seed=None):
+    """Generates a random dataset, reproducibly if a seed is given."""
+    rng = random if seed is None else random.Random(seed)
+    return [rng.randint(range_start, range_end) for _ in range(size)]
+
+def generate_data_array(size=100, range_start=1, range_end=50, seed=None):
+    """Generates a random dataset as a NumPy array, or as a list if NumPy is not installed."""
+    if np is None:
+        return generate_data(size, range_start, range_end, seed)
+    return np.random.default_rng(seed).integers(range_start, range_end, size=size, endpoint=True)
+
+def generate_chunk(seed, index, size, range_start, range_end):
+    """Generates the chunk with the given index from its own random substream of the seed."""
+    if np is None:
+        return generate_data(size, range_start, range_end, seed=f"{seed}/{index}")
+    substream = np.random.SeedSequence(seed, spawn_key=(index,))
+    return np.random.default_rng(substream).integers(range_start, range_end, size=size, endpoint=True)
+
+def generate_data_chunks(size=100, range_start=1, range_end=50, seed=None, workers=1, chunk_size=CHUNK_SIZE):
+    """Generates a random dataset chunk by chunk, in parallel if workers > 1.
+
+    Every chunk comes from its own substream of the seed (the chunk index spawned from a
+    numpy.random.SeedSequence), so the data for a seed is the same for any number of workers.
+    At most two chunks per worker are held at a time.
+    """
+    if seed is None:
+        seed = random.getrandbits(128)
+    jobs = (
+        (seed, index, min(chunk_size, size - start), range_start, range_end)
+        for index, start in enumerate(range(0, size, chunk_size))
+    )
+    if workers <= 1:
+        for job in jobs:
+            yield generate_chunk(*job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for job in jobs:
+            pending.append(executor.submit(generate_chunk, *job))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def first_occurrences(data, values):
+    """Returns the position of the first occurrence of each of the values in a NumPy array."""
+    positions = {}
+    remaining = np.asarray(values)
+    for start in range(0, data.size, FIRST_OCCURRENCE_BLOCK):
+        block = data[start:start + FIRST_OCCURRENCE_BLOCK]
+        hits = np.flatnonzero(np.isin(block, remaining))
+        if hits.size:
+            found, first = np.unique(block[hits], return_index=True)
+            positions.update(zip(found.tolist(), (hits[first] + start).tolist()))
+            remaining = np.setdiff1d(remaining, found)
+            if not remaining.size:
+                break
+    return positions
+
+def value_counts(data):
+    """Returns the distinct values of an int64 NumPy array in ascending order and their counts.
+
+    Values are counted with np.bincount if their range is small compared to the size of the
+    array, else they are sorted by np.unique.
+    """
+    low, high = int(data.min()), int(data.max())
+    if high - low < max(BINCOUNT_SPAN_FACTOR * data.size, BINCOUNT_MIN_SPAN):
+        counts = np.bincount(data - low)
+        values = np.flatnonzero(counts)
+        return values + low, counts[values]
+    return np.unique(data, return_counts=True)
+
+def analyze_array(data):
+    """Analyzes an int64 NumPy dataset from its value counts, with the same results as for a list."""
+    size = data.size
+    if size < 2:
+        raise StatisticsError("stdev requires at least two data points")
+    values, counts = value_counts(data)
+    offset = int(values[0])
+    if (int(values[-1]) - offset) * size < 2 ** 63:
+        total = int((counts * (values - offset)).sum()) + offset * size
+    else:
+        total = sum(value * count for value, count in zip(values.tolist(), counts.tolist()))
+    data_mean = total / size
+    squared_deviations = float((counts * (values - data_mean) ** 2).sum())
+    cumulative = np.cumsum(counts)
+    lower = int(values[np.searchsorted(cumulative, (size - 1) // 2, side="right")])
+    upper = int(values[np.searchsorted(cumulative, size // 2, side="right")])
+    # Like Counter.most_common, equally common values are ordered by their first occurrence
+    threshold = np.sort(counts)[-3:].min()
+    candidates = np.flatnonzero(counts >= threshold)
+    candidate_values = values[candidates]
+    candidate_counts = counts[candidates]
+    if candidates.size > np.unique(candidate_counts).size:
+        first = first_occurrences(data, candidate_values)
+    else:
+        first = {}
+    ranked = sorted(
+        zip(candidate_values.tolist(), candidate_counts.tolist()),
+        key=lambda item: (-item[1], first.get(item[0], 0))
+    )
+    return DataInsights(
+        mean=data_mean,
+        median=lower if size % 2 else (lower + upper) / 2,
+        mode=ranked[0][0],
+        stdev=math.sqrt(squared_deviations / (size - 1)),
+        most_common=ranked[:3]
+    )
 
 def analyze_data(data):
     """Analyzes the dataset and provides statistical insights."""
+    if np is not None and isinstance(data, np.ndarray):
+        # uint64 values beyond the int64 range are analyzed as a list
+        if np.issubdtype(data.dtype, np.integer) and (
+            data.dtype != np.uint64 or not data.size or data.max() < 2 ** 63
+        ):
+            return analyze_array(data.ravel().astype(np.int64, copy=False))
+        data = data.ravel().tolist()
     data_counter = Counter(data)
     return DataInsights(
         mean=mean(data),
@@ -21,17 +151,210 @@ def analyze_data(data):
         most_common=data_counter.most_common(3)  # Top 3 most common elements
     )
 
-def visualize_data(data):
-    """Creates a simple text-based histogram."""
+class P2Quantile:
+    """Estimates a quantile of a stream in constant memory (P² algorithm by Jain and Chlamtac)."""
+
+    def __init__(self, quantile=0.5):
+        self.quantile = quantile
+        self.heights = []  # The first five values, then the marker heights
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def add(self, value):
+        """Adds a value to the stream."""
+        heights, positions = self.heights, self.positions
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if value < heights[i + 1])
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        for i in range(1, 4):
+            offset = self.desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+                    (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i])
+                    + (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1])
+                )
+                if not heights[i - 1] < height < heights[i + 1]:
+                    # Linear instead of parabolic prediction
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def value(self):
+        """Returns the estimated quantile, exact while fewer than five values were added."""
+        if len(self.heights) < 5:
+            if not self.heights:
+                raise StatisticsError("no median for empty data")
+            position = (len(self.heights) - 1) * self.quantile
+            lower = self.heights[math.floor(position)]
+            upper = self.heights[math.ceil(position)]
+            return lower if lower == upper else (lower + upper) / 2
+        return self.heights[2]
+
+class InsightsAccumulator:
+    """Collects DataInsights over a stream of data chunks in a single pass.
+
+    Mean and standard deviation are merged chunk by chunk with Welford's (Chan's) update.
+    Discrete data, e.g. integers from a bounded range, is counted, which gives the exact median,
+    mode and most common values in O(range) memory. Other data only keeps a P² median estimate,
+    so memory stays constant and mode and most common values are None.
+    """
+
+    def __init__(self, discrete=True):
+        self.count = 0
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+        self.counts = Counter() if discrete else None
+        self.median_estimator = None if discrete else P2Quantile(0.5)
+
+    def update(self, chunk):
+        """Adds a chunk of data, e.g. a list, a NumPy array or a generator of numbers."""
+        if np is not None and isinstance(chunk, np.ndarray):
+            self.update_array(chunk.ravel())
+            return
+        chunk = list(chunk)
+        if not chunk:
+            return
+        chunk_mean = math.fsum(chunk) / len(chunk)
+        self.merge_moments(len(chunk), chunk_mean, math.fsum((value - chunk_mean) ** 2 for value in chunk))
+        if self.counts is not None:
+            self.counts.update(chunk)
+        else:
+            for value in chunk:
+                self.median_estimator.add(value)
+
+    def update_array(self, chunk):
+        """Adds a one-dimensional NumPy array of data."""
+        if not chunk.size:
+            return
+        chunk_mean = float(chunk.mean())
+        self.merge_moments(chunk.size, chunk_mean, float(((chunk - chunk_mean) ** 2).sum()))
+        if self.counts is not None:
+            # Count new values in order of appearance, like for lists, so ties rank the same
+            values, first, counts = np.unique(chunk, return_index=True, return_counts=True)
+            order = np.argsort(first)
+            self.counts.update(dict(zip(values[order].tolist(), counts[order].tolist())))
+        else:
+            for value in chunk.tolist():
+                self.median_estimator.add(value)
+
+    def merge_moments(self, chunk_count, chunk_mean, chunk_squared_deviations):
+        total = self.count + chunk_count
+        delta = chunk_mean - self.mean
+        self.mean += delta * chunk_count / total
+        self.squared_deviations += chunk_squared_deviations + delta ** 2 * self.count * chunk_count / total
+        self.count = total
+
+    def median(self):
+        if self.counts is None:
+            return self.median_estimator.value()
+        if not self.count:
+            raise StatisticsError("no median for empty data")
+        middle = (self.count - 1) // 2
+        seen = 0
+        lower = None
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if lower is None and seen > middle:
+                lower = value
+            if seen > self.count // 2:
+                return lower if self.count % 2 else (lower + value) / 2
+
+    def insights(self):
+        """Returns the DataInsights of all data added so far."""
+        if self.count < 2:
+            raise StatisticsError("stdev requires at least two data points")
+        most_common = self.counts.most_common(3) if self.counts is not None else None
+        return DataInsights(
+            mean=self.mean,
+            median=self.median(),
+            mode=most_common[0][0] if most_common else None,
+            stdev=math.sqrt(self.squared_deviations / (self.count - 1)),
+            most_common=most_common
+        )
+
+def analyze_stream(chunks, discrete=True):
+    """Analyzes a dataset given in chunks, e.g. from a generator, in a single pass."""
+    accumulator = InsightsAccumulator(discrete)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.insights()
+
+def visualize_data(data, top=None):
+    """Creates a simple text-based histogram of the top most common values."""
     data_counter = Counter(data)
-    for value, count in data_counter.most_common():
-        print(f"{value:2}: {'#' * count}")
+    render_histogram(data_counter.most_common(top), label_width=2)
+
+class CyclicView(Sequence):
+    """A read-only view repeating a dataset cyclically, without copying it.
+
+    Element i is data[(start + i * step) % len(data)], so data can be any indexable buffer such as
+    a list, an array.array, a memoryview or a NumPy array. Slices are views of the same data.
+    """
+
+    def __init__(self, data, size, start=0, step=1):
+        self.data = data
+        self.size = size if len(data) else 0
+        self.start = start
+        self.step = step
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, _, step = index.indices(self.size)
+            return CyclicView(
+                self.data, len(range(*index.indices(self.size))), self.start + start * self.step, self.step * step
+            )
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("cyclic view index out of range")
+        return self.data[(self.start + index * self.step) % len(self.data)]
+
+    def __iter__(self):
+        data, length = self.data, len(self.data)
+        for index in range(self.size):
+            yield data[(self.start + index * self.step) % length]
+
+    def to_array(self):
+        """Copies the view into a NumPy array, or a list if NumPy is not installed."""
+        if np is None:
+            return list(self)
+        data = np.asarray(self.data)
+        if self.start % max(len(data), 1) == 0 and self.step == 1:
+            return np.resize(data, self.size)
+        return data[(self.start + self.step * np.arange(self.size)) % len(data)]
 
 def create_cyclic_pattern(data, pattern_size=10):
-    """Creates a cyclic pattern from the dataset."""
+    """Creates a cyclic pattern from the dataset, which may be any iterable.
+
+    Indexable datasets are read through a CyclicView, other iterables are consumed once.
+    """
+    if isinstance(data, Sequence) or (np is not None and isinstance(data, np.ndarray)):
+        return list(CyclicView(data, pattern_size))
     pattern = list(islice(cycle(data), pattern_size))
     return pattern
 
+def cyclic_view(data, pattern_size=10):
+    """Creates a cyclic pattern from the dataset as a view, see CyclicView."""
+    return CyclicView(data, pattern_size)
+
 # Main Program
 if __name__ == "__main__":
     # Step 1: Generate random data
@@ -0,0 +1,50 @@
+import sys
+
+# Default number of characters of the longest bar
+BAR_WIDTH = 50
+FULL_BLOCK = "█"
+# Blocks filled by 0/8 up to 7/8
+PARTIAL_BLOCKS = ("", "▏", "▎", "▍", "▌", "▋", "▊", "▉")
+
+
+def render_histogram(items, top=None, width=BAR_WIDTH, label_width=0, file=None):
+    """
+    Prints a text histogram of (label, count) pairs in a single write.
+
+    Bars are scaled down so the longest one is at most `width` characters, with eighth blocks
+    for the fractions, and each row ends with its count.
+
+    Args:
+        items (iterable): The (label, count) pairs, in the order to show them.
+        top (int): The number of rows to show, the rest are summarized in one line. Defaults to all.
+        width (int): The maximum bar length in characters. Defaults to BAR_WIDTH.
+        label_width (int): The minimum width of the labels. Defaults to 0.
+        file (file): Where to write the histogram. Defaults to sys.stdout.
+
+    Raises:
+        ValueError: If width is less than 1.
+
+    >>> render_histogram([("python", 2), ("amazing", 4)], label_width=10)
+    python    : ██ 2
+    amazing   : ████ 4
+    >>> render_histogram([("a", 400), ("b", 150), ("c", 1)], width=8, top=2)
+    a: ████████ 400
+    b: ███ 150
+    ... 1 more
+    """
+    if width < 1:
+        raise ValueError("width must be at least 1")
+    items = list(items)
+    shown = items[:top]
+    largest = max((count for _, count in shown), default=0)
+    # Eighths of a block per counted item, nonzero counts get at least one eighth
+    scale = 8 * min(1, width / largest) if largest else 0
+    bars = [FULL_BLOCK * (eighths // 8) + PARTIAL_BLOCKS[eighths % 8] for eighths in range(8 * width + 1)]
+    lines = [
+        f"{label:{label_width}}: {bars[int(count * scale + 0.5) or count > 0]} {count}"
+        for label, count in shown
+    ]
+    if len(items) > len(shown):
+        lines.append(f"... {len(items) - len(shown)} more")
+    if lines:
+        (file or sys.stdout).write("\n".join(lines) + "\n")
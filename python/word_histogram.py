@@ -1,26 +1,290 @@
-def word_histogram(text):
+import heapq
+import math
+import mmap
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from text_histogram import render_histogram
+
+# Maps the punctuation around words to spaces, so str.split drops it
+PUNCTUATION_TABLE = str.maketrans('.,!?;:"', " " * 7)
+# Bytes of a file decoded and counted at once by a worker
+BLOCK_SIZE = 16 * 1024 * 1024
+# Chunks per worker, so workers finishing early can take over more work
+CHUNKS_PER_WORKER = 4
+WHITESPACE = re.compile(rb"\s")
+# Lines counted exactly before their counts are added to an approximate sketch
+SKETCH_BATCH_LINES = 10_000
+
+
+def count_words(lines):
+    """
+    Counts the words of a text in a single pass.
+
+    Args:
+        lines (iterable): The lines of the text, e.g. an open file.
+
+    Returns:
+        Counter: The number of occurrences of each lowercased word.
+    """
+    word_counts = Counter()
+    for line in lines:
+        word_counts.update(line.lower().translate(PUNCTUATION_TABLE).split())
+    return word_counts
+
+
+def next_whitespace(data, position, end):
+    """
+    Finds the first whitespace byte at or after position, or end if there is none.
+    """
+    match = WHITESPACE.search(data, position, end)
+    return match.start() if match else end
+
+
+def split_file(file_name, chunks):
+    """
+    Splits a file into byte ranges which start and end at whitespace, so no word is cut.
+
+    Args:
+        file_name (str): The name of the file to split.
+        chunks (int): The number of ranges to aim for.
+
+    Returns:
+        list: The (start, end) byte ranges covering the file.
+    """
+    size = os.path.getsize(file_name)
+    if not size:
+        return []
+    with open(file_name, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        boundaries = [0]
+        for chunk in range(1, chunks):
+            boundary = next_whitespace(data, max(size * chunk // chunks, boundaries[-1]), size)
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def count_file_range(file_name, start, end):
+    """
+    Counts the words in a byte range of a UTF-8 file, which is memory-mapped block by block.
+
+    Args:
+        file_name (str): The name of the file.
+        start (int): The first byte of the range, at a word boundary.
+        end (int): The byte after the range, at a word boundary.
+
+    Returns:
+        Counter: The number of occurrences of each lowercased word in the range.
+    """
+    word_counts = Counter()
+    with open(file_name, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        while start < end:
+            # Whitespace bytes are ASCII, so blocks never split a UTF-8 character
+            block_end = next_whitespace(data, min(start + BLOCK_SIZE, end), end)
+            text = data[start:block_end].decode("utf-8", errors="replace")
+            word_counts.update(text.lower().translate(PUNCTUATION_TABLE).split())
+            start = block_end
+    return word_counts
+
+
+def count_words_parallel(file_name, workers=None):
+    """
+    Counts the words of a UTF-8 file with several processes, each mapping its own parts of the file.
+
+    Args:
+        file_name (str): The name of the file.
+        workers (int): The number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        Counter: The number of occurrences of each lowercased word.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = split_file(file_name, workers * CHUNKS_PER_WORKER)
+    word_counts = Counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(count_file_range, file_name, start, end) for start, end in ranges]
+        for future in futures:
+            word_counts.update(future.result())
+    return word_counts
+
+
+class SpaceSaving:
+    """
+    Approximate counts of the most frequent words in bounded memory (Space-Saving algorithm).
+
+    At most `capacity` words are tracked. A new word replaces the word with the lowest count
+    and inherits that count as its possible overestimate, so every estimated count lies between
+    the true count and the true count plus total / capacity. Sketches of different streams can
+    be merged, e.g. after sending them between hosts with to_dict and from_dict.
+
+    Attributes:
+        capacity (int): The maximum number of tracked words.
+        total (int): The number of words counted.
+        counts (dict): The estimated count of each tracked word.
+        errors (dict): The maximum overestimate of each tracked word's count.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+        self.heap = []  # (count, word) entries, some outdated, to find the lowest count
+
+    @classmethod
+    def for_error(cls, error):
+        """
+        Creates a sketch whose counts are overestimated by at most error * total.
+        """
+        return cls(math.ceil(1 / error))
+
+    def add(self, word, count=1):
+        """
+        Counts count occurrences of word.
+        """
+        self.total += count
+        if word in self.counts:
+            self.counts[word] += count
+            return
+        error = 0
+        if len(self.counts) >= self.capacity:
+            error, evicted = heapq.heappop(self.heap)
+            while self.counts[evicted] != error:
+                heapq.heappush(self.heap, (self.counts[evicted], evicted))
+                error, evicted = heapq.heappop(self.heap)
+            del self.counts[evicted], self.errors[evicted]
+        self.counts[word] = error + count
+        self.errors[word] = error
+        heapq.heappush(self.heap, (error + count, word))
+
+    def update(self, lines):
+        """
+        Counts the words of the given lines, tokenized like count_words.
+        """
+        lines = iter(lines)
+        while batch := list(islice(lines, SKETCH_BATCH_LINES)):
+            for word, count in count_words(batch).items():
+                self.add(word, count)
+
+    def minimum(self):
+        """
+        Returns the count any untracked word may have, 0 while the sketch is not full.
+        """
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other):
+        """
+        Returns a sketch of both streams with the capacity of this one.
+
+        Words missing in one sketch may have had up to that sketch's minimum count there.
+        """
+        merged = SpaceSaving(self.capacity)
+        merged.total = self.total + other.total
+        own_minimum, other_minimum = self.minimum(), other.minimum()
+        estimates = [
+            (
+                self.counts.get(word, own_minimum) + other.counts.get(word, other_minimum),
+                self.errors.get(word, own_minimum) + other.errors.get(word, other_minimum),
+                word,
+            )
+            for word in self.counts.keys() | other.counts.keys()
+        ]
+        for count, error, word in heapq.nlargest(self.capacity, estimates):
+            merged.counts[word] = count
+            merged.errors[word] = error
+            merged.heap.append((count, word))
+        heapq.heapify(merged.heap)
+        return merged
+
+    def most_common(self, top=None):
+        """
+        Returns the (word, count, error) triples of the words with the highest counts.
+
+        The true count of each word lies between count - error and count.
+        """
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:top]
+        return [(word, count, self.errors[word]) for word, count in ranked]
+
+    def to_dict(self):
+        return {"capacity": self.capacity, "total": self.total, "counts": self.counts, "errors": self.errors}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["capacity"])
+        sketch.total = data["total"]
+        sketch.counts = dict(data["counts"])
+        sketch.errors = dict(data["errors"])
+        sketch.heap = [(count, word) for word, count in sketch.counts.items()]
+        heapq.heapify(sketch.heap)
+        return sketch
+
+
+def print_histogram(word_counts):
+    """
+    Prints a histogram of (word, count) pairs, the longest bar BAR_WIDTH characters long (see render_histogram).
+
+    Args:
+        word_counts (iterable): The (word, count) pairs to print, in order.
+    """
+    render_histogram(word_counts, label_width=10)
+
+
+def word_histogram(text, top=None):
     """
     Generates a word frequency histogram from the given text.
 
     Args:
         text (str): The input text to analyze.
+        top (int): The number of most frequent words to show. Defaults to all words.
 
     Prints:
         A histogram displaying the frequency of each word in the text.
     """
-    words = text.lower().split()
-    words = tuple(map(lambda w: w.strip('.,!?;:"'), words))
-    word_counts = {word: words.count(word) for word in set(words)}
-    sorted_counts = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
+    print_histogram(count_words([text]).most_common(top))
 
-    for word, count in sorted_counts:
-        print(f"{word:10}: {'#' * count}")
 
+def word_histogram_file(file_name, top=None, workers=None, max_words=None):
+    """
+    Generates a word frequency histogram from a UTF-8 text file, reading it line by line.
 
-if __name__ == "__main__":
-    text = input("Text: ") or """
-    Python is amazing! Amazing tools, amazing community, and amazing code.
-    Python is simple and elegant, yet powerful.
+    Args:
+        file_name (str): The name of the text file to analyze.
+        top (int): The number of most frequent words to show. Defaults to all words.
+        workers (int): Count the words with this many processes instead. Defaults to None.
+        max_words (int): Keep approximate counts of at most this many words instead (see SpaceSaving).
+            Defaults to None.
+
+    Prints:
+        A histogram displaying the frequency of each word in the file.
     """
-    print("Word Frequency Histogram:")
-    word_histogram(text)
+    if max_words:
+        sketch = SpaceSaving(max_words)
+        with open(file_name, encoding="utf-8", errors="replace") as file:
+            sketch.update(file)
+        print_histogram((word, count) for word, count, _ in sketch.most_common(top))
+        return
+    if workers:
+        print_histogram(count_words_parallel(file_name, workers).most_common(top))
+        return
+    with open(file_name, encoding="utf-8", errors="replace") as file:
+        print_histogram(count_words(file).most_common(top))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Usage: word_histogram.py FILE [TOP [WORKERS]]
+        arguments = [int(argument) for argument in sys.argv[2:4]]
+        print("Word Frequency Histogram:")
+        word_histogram_file(sys.argv[1], *arguments)
+    else:
+        text = input("Text: ") or """
+        Python is amazing! Amazing tools, amazing community, and amazing code.
+        Python is simple and elegant, yet powerful.
+        """
+        print("Word Frequency Histogram:")
+        word_histogram(text)
@@ -0,0 +1,56 @@
+# Scaling benchmark of the parallel word count on a synthetic corpus
+# Usage: word_histogram_benchmark.py [SIZE_IN_MB [FILE]]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from word_histogram import count_words_parallel
+
+
+def generate_corpus(file_name, size, seed=42):
+    """Writes about size bytes of random words with punctuation and line breaks."""
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(2, 10)))
+        for _ in range(50_000)
+    ]
+    # A few MB of distinct text, repeated with a different offset each time
+    words = rng.choices(vocabulary, k=500_000)
+    lines = [
+        " ".join(words[start:start + 12]) + rng.choice(".,!?;:")
+        for start in range(0, len(words), 12)
+    ]
+    written = 0
+    with open(file_name, "w") as file:
+        while written < size:
+            offset = rng.randrange(len(lines))
+            written += file.write("\n".join(lines[offset:] + lines[:offset]) + "\n")
+
+
+def benchmark(file_name):
+    """Times the parallel word count with 1 up to the number of CPUs workers."""
+    size = os.path.getsize(file_name)
+    baseline = None
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        count_words_parallel(file_name, workers)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(
+            f"{workers:3} workers: {seconds:8.2f}s "
+            f"({size / seconds / 2**20:8.1f} MB/s, speedup {baseline / seconds:5.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) * 2**20 if len(sys.argv) > 1 else 2 * 2**30
+    if len(sys.argv) > 2:
+        corpus = sys.argv[2]
+    else:
+        corpus = os.path.join(tempfile.gettempdir(), "word_histogram_corpus.txt")
+    if not os.path.exists(corpus) or os.path.getsize(corpus) < size:
+        print(f"Writing a {size / 2**20:.0f} MB corpus to {corpus} ...")
+        generate_corpus(corpus, size)
+    benchmark(corpus)